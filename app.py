@@ -23,25 +23,55 @@ v6.0:
 import streamlit as st
 from PIL import Image, ImageDraw, ImageFont
 import qrcode
-import io, zipfile, csv, os, json, base64, hashlib, hmac, secrets, shutil
+import io, zipfile, csv, os, sys, json, base64, hashlib, hmac, secrets, shutil, sqlite3, threading, time
+import multiprocessing, pickle, tempfile, zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 import pandas as pd
+import numpy as np
 import openpyxl
-from openpyxl.styles import Font as XFont, PatternFill, Alignment, Border, Side
+from openpyxl.styles import Font as XFont, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 from reportlab.pdfgen import canvas as pdf_canvas
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab import rl_config
 from datetime import datetime
 
+rl_config.useA85 = 0   # binary PDF streams — skips a pure-Python ASCII85 pass over every image
+
 # ══════════════════════════════════════════════════════════════════
 #  FILE PATHS
 # ══════════════════════════════════════════════════════════════════
-DATA_FILE   = "registrations.csv"
+DATA_FILE   = "registrations.csv"     # legacy CSV store — migrated into DB_FILE once
+DB_FILE     = "registrations.db"
 CONFIG_FILE = "config.json"
 AUTH_FILE   = "auth.json"
 BACKUP_DIR  = "backups"
+RENDER_CACHE_DIR = "render_cache"    # rendered cards/certificates, named by content digest
+ASSET_DIR   = "assets"                # uploaded logos, named by content digest
 CSV_HEADERS = ["ref_no","name","roll_no","department","batch",
                "category","event","date","time"]
+PAGE_SIZE   = 100   # rows per page in the admin registrations table
+BATCH_WORKERS_MAX = 8   # cap on the default — each worker holds its own template/fonts
+
+def usable_cpus():
+    """CPUs this process may actually use: the affinity mask, further limited by a
+    cgroup v2 CPU quota (containers often report every host CPU in os.cpu_count())."""
+    try:    n = len(os.sched_getaffinity(0))
+    except AttributeError: n = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f: quota, period = f.read().split()[:2]
+        if quota != "max": n = min(n, max(1, int(quota)//int(period)))
+    except (OSError, ValueError): pass
+    return max(1, n)
+
+BATCH_WORKERS = min(usable_cpus(), BATCH_WORKERS_MAX)   # default worker processes for bulk jobs
 
 # ══════════════════════════════════════════════════════════════════
 #  SECURE PASSWORD  (PBKDF2-HMAC-SHA256)
@@ -89,66 +119,349 @@ CFG_DEFAULTS = {
     "student_cats": "Participant",
     "app_url":      "",
     "inv_theme":    "royal_gold",
-    "logo1_b64":    "",
-    "logo2_b64":    "",
-    "logo3_b64":    "",
+    "logo1_ref":    "",
+    "logo2_ref":    "",
+    "logo3_ref":    "",
 }
 
+def _config_store():
+    return _store("config", lambda: {"stamp":None,"saved":None,"hits":0,"misses":0,
+                                     "lock":threading.Lock()})
+
 def load_config():
-    if not os.path.exists(CONFIG_FILE):
-        return CFG_DEFAULTS.copy()
+    """Settings merged over CFG_DEFAULTS. The parsed file is kept in-process and
+    re-read only when its mtime/size changes, so a form view costs one stat()."""
+    try: fs = os.stat(CONFIG_FILE)
+    except OSError: return CFG_DEFAULTS.copy()
+    stamp = (fs.st_mtime_ns, fs.st_size)
+    cs    = _config_store()
+    with cs["lock"]:
+        if cs["stamp"] == stamp:
+            cs["hits"] += 1
+            out = CFG_DEFAULTS.copy(); out.update(cs["saved"]); return out
+        cs["misses"] += 1
     try:
         with open(CONFIG_FILE,"r",encoding="utf-8") as f:
             saved = json.load(f)
-        out = CFG_DEFAULTS.copy(); out.update(saved); return out
     except: return CFG_DEFAULTS.copy()
+    if any(f"logo{i}_b64" in saved for i in (1,2,3)):
+        # one-time migration: base64 logo blobs move to assets/, config keeps refs
+        for i in (1,2,3):
+            saved[f"logo{i}_ref"] = cfg_logo_ref(saved, i); saved.pop(f"logo{i}_b64", None)
+        save_config(saved)
+    else:
+        with cs["lock"]: cs["stamp"], cs["saved"] = stamp, saved
+    out = CFG_DEFAULTS.copy(); out.update(saved); return out
 
 def save_config(cfg):
-    with open(CONFIG_FILE,"w",encoding="utf-8") as f:
+    tmp = f"{CONFIG_FILE}.{os.getpid()}.tmp"   # atomic — form views never read half a file
+    with open(tmp,"w",encoding="utf-8") as f:
         json.dump(cfg, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, CONFIG_FILE)
+    cs = _config_store()
+    with cs["lock"]: cs["stamp"] = None
+
+def config_cache_stats():
+    cs = _config_store(); n = cs["hits"]+cs["misses"]
+    return {"hits":cs["hits"],"misses":cs["misses"],"hit_rate":cs["hits"]/n if n else 0.0,
+            "kb":os.path.getsize(CONFIG_FILE)/1e3 if os.path.exists(CONFIG_FILE) else 0.0}
+
+# ── Binary assets (logos) ──
+def save_asset(data):
+    """Store bytes under their SHA-1 and return that digest as the asset ref.
+    Content-addressed, so a file is never rewritten once it exists."""
+    ref = hashlib.sha1(data).hexdigest()
+    p   = os.path.join(ASSET_DIR, ref)
+    if not os.path.exists(p):
+        os.makedirs(ASSET_DIR, exist_ok=True)
+        tmp = f"{p}.{os.getpid()}.tmp"
+        with open(tmp,"wb") as f: f.write(data)
+        os.replace(tmp, p)
+    return ref
+
+def asset_bytes(ref):
+    with open(os.path.join(ASSET_DIR, ref),"rb") as f: return f.read()
+
+def cfg_logo_ref(cfg, i):
+    """Asset ref of logo i; a legacy base64 logo is stored as an asset on the way."""
+    ref = cfg.get(f"logo{i}_ref")
+    if ref: return ref
+    try:    data = base64.b64decode(cfg.get(f"logo{i}_b64") or "")
+    except: data = b""
+    return save_asset(data) if data else ""
+
+# ══════════════════════════════════════════════════════════════════
+#  PROCESS-WIDE STORES  (caches & counters that survive reruns)
+# ══════════════════════════════════════════════════════════════════
+_LOCAL_STORES = None   # set inside batch workers — see _batch_init
+_THREAD_STORES = threading.local()   # .reg set for background jobs — see submit_card
+
+@st.cache_resource(show_spinner=False)
+def _process_stores():
+    return {"lock":threading.Lock()}
+
+def _store(name, factory):
+    """Named mutable store shared by every session of this server process."""
+    reg = _LOCAL_STORES if _LOCAL_STORES is not None else \
+          getattr(_THREAD_STORES,"reg",None) or _process_stores()
+    s = reg.get(name)
+    if s is None:
+        with reg["lock"]: s = reg.setdefault(name, factory())
+    return s
+
+# ── Bounded LRU caches (one shape for every in-memory cache) ──
+_MISS = object()
+
+def _lru(name, maxsize):
+    """Named process-wide LRU cache: use with lru_get / lru_put / lru_stats."""
+    c = _store("lru:"+name, lambda: {"items":OrderedDict(),"maxsize":maxsize,"hits":0,"misses":0,
+                                     "lock":threading.Lock()})
+    c["maxsize"] = maxsize
+    return c
+
+def lru_get(c, key, default=None):
+    """Cached value for `key` (now most recent), else `default`. Counts a hit or miss."""
+    with c["lock"]:
+        v = c["items"].get(key, _MISS)
+        if v is _MISS: c["misses"] += 1; return default
+        c["items"].move_to_end(key); c["hits"] += 1; return v
+
+def lru_put(c, key, value):
+    """Store `value`, evicting least-recently used entries past maxsize → value."""
+    with c["lock"]:
+        c["items"][key] = value; c["items"].move_to_end(key)
+        while len(c["items"]) > c["maxsize"]: c["items"].popitem(last=False)
+    return value
+
+def lru_stats(c):
+    with c["lock"]:
+        n = c["hits"]+c["misses"]
+        return {"hits":c["hits"],"misses":c["misses"],"size":len(c["items"]),"max":c["maxsize"],
+                "hit_rate":c["hits"]/n if n else 0.0}
 
 # ══════════════════════════════════════════════════════════════════
-#  CSV DATABASE
+#  REGISTRATION STORE  (SQLite, WAL)
 # ══════════════════════════════════════════════════════════════════
+_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ref_no TEXT, name TEXT, roll_no TEXT, department TEXT, batch TEXT,
+    category TEXT, event TEXT, date TEXT, time TEXT);
+CREATE INDEX IF NOT EXISTS ix_reg_ref_no   ON registrations(ref_no);
+CREATE INDEX IF NOT EXISTS ix_reg_category ON registrations(category);
+CREATE INDEX IF NOT EXISTS ix_reg_date     ON registrations(date);
+CREATE TABLE IF NOT EXISTS sequences(name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS reg_stats(dim TEXT, key TEXT, n INTEGER NOT NULL, PRIMARY KEY(dim,key));
+"""
+REF_SEQ = "ref_no"   # one global counter — Reg Nos stay unique across categories
+CSV_MIGRATED = "csv_migrated"   # marker row: legacy CSV already imported
+REG_GEN = "reg_gen"  # bumped by every write — the registrations cache key
+REG_EPOCH = "reg_epoch"  # bumped when rows are removed/replaced — no tail read possible
+STAT_DIMS = ("category","department","batch","date")   # running counts kept in reg_stats
+_REG_COLS = ",".join(CSV_HEADERS)
+
+@contextmanager
+def _db():
+    """Short-lived connection; commits on success, rolls back on error."""
+    con = sqlite3.connect(DB_FILE, timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA synchronous=NORMAL")
+    try:
+        with con: yield con
+    finally: con.close()
+
+def _row(r):
+    return {k: str(r.get(k,"") or "") for k in CSV_HEADERS}
+
+def _insert_rows(con, rows):
+    con.executemany(
+        f"INSERT INTO registrations({_REG_COLS}) VALUES({','.join('?'*len(CSV_HEADERS))})",
+        [tuple(_row(r).values()) for r in rows])
+
+def _bump(con, name):
+    con.execute("INSERT OR IGNORE INTO sequences VALUES(?,0)", (name,))
+    con.execute("UPDATE sequences SET value=value+1 WHERE name=?", (name,))
+    return con.execute("SELECT value FROM sequences WHERE name=?", (name,)).fetchone()[0]
+
+# ── Aggregate index: counts per dimension value, in first-seen order ──
+def _stats_add(con, rec):
+    con.executemany("INSERT INTO reg_stats VALUES(?,?,1) "
+                    "ON CONFLICT(dim,key) DO UPDATE SET n=n+1",
+                    [(d, str(rec.get(d,"") or "")) for d in STAT_DIMS])
+
+def _stats_rebuild(con):
+    con.execute("DELETE FROM reg_stats")
+    for d in STAT_DIMS:
+        con.execute(f"INSERT INTO reg_stats SELECT ?,COALESCE({d},''),COUNT(*) FROM registrations "
+                    f"GROUP BY COALESCE({d},'') ORDER BY MIN(id)", (d,))
+
+def reg_counts(dim="category"):
+    """{value: count} for one of STAT_DIMS — O(distinct values), no table scan."""
+    with _db() as con:
+        return dict(con.execute("SELECT key,n FROM reg_stats WHERE dim=? ORDER BY rowid", (dim,)))
+
+def _seq(con, name):
+    r = con.execute("SELECT value FROM sequences WHERE name=?", (name,)).fetchone()
+    return r[0] if r else 0
+
+def init_db():
+    with _db() as con:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript(_DB_SCHEMA)
+        if not con.execute("SELECT 1 FROM reg_stats LIMIT 1").fetchone(): _stats_rebuild(con)
+    migrate_csv()
+    with _db() as con:   # seed once from existing data, above every Reg No already issued
+        if not con.execute("SELECT 1 FROM sequences WHERE name=?", (REF_SEQ,)).fetchone():
+            con.execute("INSERT INTO sequences VALUES(?,?)", (REF_SEQ, _ref_floor(con)))
+
+def _ref_floor(con):
+    """Lowest safe REF_SEQ value: the highest numeric Reg No suffix on file, or the
+    row count if that is larger. Numbers aren't reused after a Clear, so the
+    suffixes can run past the row count."""
+    hi = con.execute("SELECT COUNT(*) FROM registrations").fetchone()[0]
+    for (ref,) in con.execute("SELECT ref_no FROM registrations"):
+        tail = (ref or "").rsplit("-",1)[-1].strip()
+        if tail.isascii() and tail.isdigit(): hi = max(hi, int(tail))
+    return hi
+
+@st.cache_resource(show_spinner=False)
+def init_db_once():
+    """init_db() once per server process — not on every rerun, where its seed
+    INSERT would queue behind (or fail on) any write in progress."""
+    init_db(); return True
+
+def migrate_csv(path=DATA_FILE):
+    """One-time import of a legacy registrations.csv; the file is kept as *.migrated.
+    The marker row commits with the rows, so a crash before the rename can't
+    import the file a second time."""
+    if not os.path.exists(path): return 0
+    with open(path,"r",encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    n = 0
+    with _db() as con:
+        if con.execute("INSERT OR IGNORE INTO sequences VALUES(?,1)", (CSV_MIGRATED,)).rowcount:
+            _insert_rows(con, rows); _stats_rebuild(con); _bump(con, REG_GEN); n = len(rows)
+    os.replace(path, path+".migrated")
+    return n
+
+def next_sequence(name=REF_SEQ):
+    """Atomically allocate the next value; the write lock serialises concurrent submits."""
+    with _db() as con: return _bump(con, name)
+
 def generate_ref_no(category):
     """Short alphanumeric: e.g. P-0042  TC-0017  SP-0003"""
-    regs  = load_registrations()
-    count = len(regs) + 1
+    count = next_sequence()
     words = category.strip().split()
     code  = words[0][0].upper() if words else "R"
     if len(words) > 1: code += words[1][0].upper()
     return f"{code}-{count:04d}"
 
+# ── Shared registrations cache ──
+# One parsed copy per server process, valid while its generation matches
+# REG_GEN in the database. Rows are shared — treat them as read-only.
+# Within one epoch rows are only ever appended, so a stale copy catches up
+# by reading the tail (id > last_id) instead of the whole table.
+def _reg_cache():
+    return _store("registrations", lambda: {"gen":None,"epoch":None,"last_id":0,"rows":[],
+                                            "hits":0,"misses":0,"tails":0,"tail_rows":0,
+                                            "appends":0,"lock":threading.Lock()})
+
 def save_registration(rec):
-    exists = os.path.exists(DATA_FILE)
-    with open(DATA_FILE,"a",newline="",encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        if not exists: w.writeheader()
-        w.writerow({k: rec.get(k,"") for k in CSV_HEADERS})
+    with _db() as con:
+        _insert_rows(con, [rec])
+        rid = con.execute("SELECT last_insert_rowid()").fetchone()[0]
+        _stats_add(con, rec); gen = _bump(con, REG_GEN)
+    rc = _reg_cache()
+    with rc["lock"]:   # write-through when nothing else was written in between
+        if rc["gen"] == gen-1:
+            rc["rows"].append(_row(rec)); rc["gen"] = gen; rc["last_id"] = rid
+            rc["appends"] += 1
+
+def _read_rows(con, after=0):
+    rows, last = [], after
+    for r in con.execute(f"SELECT id,{_REG_COLS} FROM registrations WHERE id>? ORDER BY id",
+                         (after,)):
+        d = dict(r); last = d.pop("id"); rows.append(d)
+    return rows, last
 
 def load_registrations():
-    if not os.path.exists(DATA_FILE): return []
+    rc = _reg_cache()
     try:
-        with open(DATA_FILE,"r",encoding="utf-8") as f:
-            return list(csv.DictReader(f))
-    except: return []
+        with rc["lock"], _db() as con:
+            con.execute("BEGIN")   # one snapshot for the counters and the rows
+            gen, epoch = _seq(con, REG_GEN), _seq(con, REG_EPOCH)
+            if rc["gen"] == gen:
+                rc["hits"] += 1; return list(rc["rows"])
+            if rc["gen"] is not None and rc["epoch"] == epoch:
+                new, rc["last_id"] = _read_rows(con, rc["last_id"])
+                rc["rows"].extend(new); rc["tails"] += 1; rc["tail_rows"] += len(new)
+            else:
+                rc["rows"], rc["last_id"] = _read_rows(con); rc["misses"] += 1
+            rc["gen"], rc["epoch"] = gen, epoch
+            return list(rc["rows"])
+    except sqlite3.Error: return []
+
+def registrations_gen():
+    """Write generation of the registrations table — changes on every save/restore/clear."""
+    with _db() as con: return _seq(con, REG_GEN)
+
+def reg_cache_stats():
+    rc = _reg_cache(); n = rc["hits"]+rc["misses"]+rc["tails"]
+    return {"rows":len(rc["rows"]),"gen":rc["gen"],"hits":rc["hits"],"misses":rc["misses"],
+            "tails":rc["tails"],"tail_rows":rc["tail_rows"],"appends":rc["appends"],
+            "hit_rate":rc["hits"]/n if n else 0.0}
+
+def load_registrations_page(page=0, per_page=100, category=None):
+    """One page of registrations (oldest first), optionally for a single category."""
+    q, args = f"SELECT {_REG_COLS} FROM registrations", []
+    if category: q += " WHERE category=?"; args.append(category)
+    q += " ORDER BY id LIMIT ? OFFSET ?"; args += [per_page, page*per_page]
+    with _db() as con: return [dict(r) for r in con.execute(q, args)]
+
+def count_registrations(category=None):
+    c = reg_counts("category")
+    return c.get(category,0) if category else sum(c.values())
+
+def replace_registrations(rows):
+    """Restore: swap the whole table for `rows` in one transaction."""
+    with _db() as con:
+        con.execute("DELETE FROM registrations")
+        _insert_rows(con, rows); _stats_rebuild(con); _bump(con, REG_GEN); _bump(con, REG_EPOCH)
+        con.execute("INSERT INTO sequences VALUES(?,?) "
+                    "ON CONFLICT(name) DO UPDATE SET value=MAX(value,excluded.value)",
+                    (REF_SEQ, _ref_floor(con)))
 
 def clear_registrations():
-    if os.path.exists(DATA_FILE): os.remove(DATA_FILE)
+    """Deletes rows only — the Reg No sequence keeps counting so numbers are never reused."""
+    with _db() as con:
+        con.execute("DELETE FROM registrations"); con.execute("DELETE FROM reg_stats")
+        _bump(con, REG_GEN); _bump(con, REG_EPOCH)
+
+def registrations_csv():
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=CSV_HEADERS)
+    w.writeheader(); w.writerows(load_registrations())
+    return buf.getvalue().encode("utf-8")
 
 # ══════════════════════════════════════════════════════════════════
 #  BACKUP
 # ══════════════════════════════════════════════════════════════════
-def create_backup():
+def create_backup(level=None, stats=None):
     buf = io.BytesIO()
     ts  = datetime.now().strftime("%Y%m%d_%H%M%S")
     with zipfile.ZipFile(buf,"w",zipfile.ZIP_DEFLATED) as zf:
-        for fname in [DATA_FILE, CONFIG_FILE]:
-            if os.path.exists(fname): zf.write(fname, f"backup_{ts}/{fname}")
-        zf.writestr(f"backup_{ts}/README.txt",
+        zip_put(zf, f"backup_{ts}/{DATA_FILE}", registrations_csv(), level, stats)
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE,"rb") as f:
+                zip_put(zf, f"backup_{ts}/{CONFIG_FILE}", f.read(), level, stats)
+            cfg = load_config()
+            for ref in sorted({cfg[f"logo{i}_ref"] for i in (1,2,3)} - {""}):
+                try: zip_put(zf, f"backup_{ts}/{ASSET_DIR}/{ref}", asset_bytes(ref), level, stats)
+                except OSError: pass
+        zip_put(zf, f"backup_{ts}/README.txt",
             f"Backup: {datetime.now().isoformat()}\n"
             "Restore: copy files back to app folder.\n"
-            "auth.json excluded for security.")
+            "auth.json excluded for security.", level, stats)
     return buf.getvalue()
 
 def auto_backup():
@@ -157,6 +470,114 @@ def auto_backup():
     if not os.path.exists(bfile):
         with open(bfile,"wb") as f: f.write(create_backup())
 
+# ══════════════════════════════════════════════════════════════════
+#  ZIP ENTRY POLICY  (don't re-deflate already-compressed files)
+# ══════════════════════════════════════════════════════════════════
+ZIP_STORED_EXT = (".png",".jpg",".jpeg",".pdf")   # already compressed → STORED
+ZIP_LEVEL      = 6                                 # DEFLATE level for CSV/JSON/TXT
+
+def zip_stats():
+    return {"stored":0,"stored_bytes":0,"deflated":0,"raw_bytes":0,"packed_bytes":0,
+            "seconds":0.0,"probe":None}
+
+def zip_put(zf, arcname, data, level=None, stats=None):
+    """writestr() with a per-entry policy: PNG/JPEG/PDF are STORED,
+    everything else is DEFLATED at `level` (default ZIP_LEVEL)."""
+    level  = ZIP_LEVEL if level is None else level
+    stored = arcname.lower().endswith(ZIP_STORED_EXT)
+    t0 = time.perf_counter()
+    if stored: zf.writestr(arcname, data, compress_type=zipfile.ZIP_STORED)
+    else:      zf.writestr(arcname, data, compress_type=zipfile.ZIP_DEFLATED, compresslevel=level)
+    if stats is None: return
+    stats["seconds"] += time.perf_counter()-t0
+    if isinstance(data, str): data = data.encode("utf-8")
+    if stored:
+        stats["stored"] += 1; stats["stored_bytes"] += len(data)
+        if stats["probe"] is None:   # deflate one sample to estimate what STORED saves
+            t1 = time.perf_counter(); n = len(zlib.compress(data, level))
+            stats["probe"] = (len(data), n, time.perf_counter()-t1)
+    else:
+        stats["deflated"] += 1; stats["raw_bytes"] += len(data)
+        stats["packed_bytes"] += zf.getinfo(arcname).compress_size
+
+def zip_stats_text(stats):
+    msg = (f"🗜️ {stats['stored']} entries stored as-is ({stats['stored_bytes']/1e6:,.1f} MB), "
+           f"{stats['deflated']} deflated ({stats['raw_bytes']/1e6:,.2f} → {stats['packed_bytes']/1e6:,.2f} MB) "
+           f"in {stats['seconds']:.1f}s")
+    if stats["probe"]:
+        raw, packed, dt = stats["probe"]; k = stats["stored_bytes"]/max(raw,1)
+        msg += (f" — skipped ≈ {dt*k:.1f}s of DEFLATE that would have saved only "
+                f"≈ {(raw-packed)*k/1e6:,.2f} MB ({(raw-packed)/max(raw,1):.1%})")
+    return msg
+
+# ══════════════════════════════════════════════════════════════════
+#  ARCHIVE SPOOL  (bulk ZIPs are built on disk, not in RAM)
+# ══════════════════════════════════════════════════════════════════
+SPOOL_DIR = os.path.join(tempfile.gettempdir(), "qr_cert_spool")
+SPOOL_TTL = 6*3600   # abandoned spools are swept after 6 hours
+
+def new_spool(key, prefix, suffix):
+    """Fresh spool file for session slot `key`, replacing any older one → path."""
+    discard_spool(key)
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=prefix+"_", suffix=suffix, dir=SPOOL_DIR)
+    os.close(fd)
+    st.session_state[key] = path; st.session_state[f"{key}_fresh"] = True
+    return path
+
+def open_spool(key, prefix):
+    """Start a new on-disk ZIP for session slot `key`."""
+    return zipfile.ZipFile(new_spool(key, prefix, ".zip"), "w", zipfile.ZIP_DEFLATED)
+
+def discard_spool(key):
+    st.session_state.pop(f"{key}_fresh", None)
+    path = st.session_state.pop(key, None)
+    if path and os.path.exists(path):
+        try: os.remove(path)
+        except OSError: pass
+
+def sweep_spools():
+    if not os.path.isdir(SPOOL_DIR): return
+    cutoff = time.time()-SPOOL_TTL
+    for f in os.listdir(SPOOL_DIR):
+        p = os.path.join(SPOOL_DIR, f)
+        try:
+            if os.path.getmtime(p) < cutoff: os.remove(p)
+        except OSError: pass
+
+def spool_download(label, key, file_name, mime="application/zip"):
+    """Download button fed from the spooled file; the spool is deleted once downloaded.
+    Drawing the button copies the whole file into Streamlit's media store, so that
+    happens only in the run that built the spool or after an explicit click."""
+    path = st.session_state.get(key)
+    if not path or not os.path.exists(path): return
+    mb, ph = os.path.getsize(path)/1e6, st.empty()
+    if not st.session_state.pop(f"{key}_fresh", False) and \
+       not ph.button(f"📥 Show download ({mb:,.1f} MB ready)",key=f"show_{key}",use_container_width=True):
+        return
+    ph.empty(); st.caption(f"📦 {mb:,.1f} MB ready")
+    with open(path,"rb") as f:
+        st.download_button(label, f, file_name=file_name, mime=mime,
+                           use_container_width=True, key=f"dl_{key}",
+                           on_click=discard_spool, args=(key,))
+
+# ══════════════════════════════════════════════════════════════════
+#  DEFERRED DOWNLOADS  (built on request, reused until the data changes)
+# ══════════════════════════════════════════════════════════════════
+def data_version(*parts):
+    return hashlib.sha1(json.dumps(parts,default=str,sort_keys=True).encode()).hexdigest()
+
+def lazy_download(prep, label, key, version, build, file_name, mime):
+    """Prepare button → download button. build() runs only when asked and its
+    bytes stay in the session until `version` changes."""
+    slot, ph = st.session_state.get(f"lazy_{key}"), st.empty()
+    if (not slot or slot[0]!=version) and ph.button(prep,key=f"prep_{key}",use_container_width=True):
+        with st.spinner("Preparing..."): slot = (version, build())
+        st.session_state[f"lazy_{key}"] = slot; ph.empty()
+    if slot and slot[0]==version:
+        st.download_button(label,slot[1],file_name=file_name,mime=mime,
+                           use_container_width=True,key=f"dl_{key}")
+
 # ══════════════════════════════════════════════════════════════════
 #  PAGE CONFIG
 # ══════════════════════════════════════════════════════════════════
@@ -222,7 +643,9 @@ hr{border-color:#7ecefd22!important;}
 #  STARTUP
 # ══════════════════════════════════════════════════════════════════
 _cfg = load_config()
+init_db_once()
 auto_backup()
+sweep_spools()
 
 # ══════════════════════════════════════════════════════════════════
 #  SESSION STATE
@@ -234,12 +657,14 @@ SESS = {
     "organizer":_cfg["organizer"],"categories":_cfg["categories"],
     "student_cats_input":_cfg["student_cats"],"app_url":_cfg["app_url"],
     "inv_theme":_cfg["inv_theme"],
-    "logo1_b64":_cfg["logo1_b64"],"logo2_b64":_cfg["logo2_b64"],"logo3_b64":_cfg["logo3_b64"],
     "text_x":50,"text_y":60,"font_size":72,"text_color":"#1a1a1a","selected_font":"Arial Bold",
-    "form_submitted":False,"last_submission":{},"invitation_png":None,
+    "form_submitted":False,"last_submission":{},"invitation_png":None,"card_job":None,
+    "batch_workers":BATCH_WORKERS,
 }
 for k,v in SESS.items():
     if k not in st.session_state: st.session_state[k]=v
+for i in (1,2,3):
+    if f"logo{i}_ref" not in st.session_state: st.session_state[f"logo{i}_ref"]=_cfg[f"logo{i}_ref"]
 
 # ══════════════════════════════════════════════════════════════════
 #  FONTS
@@ -386,13 +811,33 @@ def get_invite_phrase(category):
 # ══════════════════════════════════════════════════════════════════
 #  PIL HELPERS
 # ══════════════════════════════════════════════════════════════════
+FONT_CACHE_MAX = 256   # font objects kept per process (LRU)
+_CARD_FONTS = {False:("arial.ttf","DejaVuSans.ttf","calibri.ttf","times.ttf"),
+               True: ("arialbd.ttf","DejaVuSans-Bold.ttf","calibrib.ttf","timesbd.ttf")}
+
+def _font_cache():
+    return _lru("fonts", FONT_CACHE_MAX)
+
+def _get_font(name, size, bold, cands):
+    """LRU-cached font for (name,size,bold); the resolved candidate path is
+    remembered per name so failed probes happen once per process."""
+    fc, paths, key = _font_cache(), _store("font_paths", dict), (name, size, bold)
+    font = lru_get(fc, key)
+    if font is not None: return font
+    path = paths.get((name, bold), "")
+    if path == "":
+        path = None
+        for f in cands:
+            try: font = ImageFont.truetype(f, size); path = font.path; break
+            except: pass
+    elif path:
+        font = ImageFont.truetype(path, size)
+    if font is None: font = ImageFont.load_default()
+    paths[(name, bold)] = path
+    return lru_put(fc, key, font)
+
 def _fnt(size, bold=False):
-    cands = (["arialbd.ttf","DejaVuSans-Bold.ttf","calibrib.ttf","timesbd.ttf"]
-             if bold else ["arial.ttf","DejaVuSans.ttf","calibri.ttf","times.ttf"])
-    for f in cands:
-        try: return ImageFont.truetype(f, size)
-        except: pass
-    return ImageFont.load_default()
+    return _get_font("_card", size, bold, _CARD_FONTS[bold])
 
 def _rr(draw, x1,y1,x2,y2, r, fill, outline=None, ow=2):
     """Draw filled rounded rectangle with optional outline."""
@@ -423,7 +868,8 @@ def _wrap_text(draw, text, font, max_w):
     if cur: lines.append(cur)
     return lines if lines else [text]
 
-def _gradient(draw, x1,y1,x2,y2, c1, c2, vertical=True):
+def _gradient_lines(draw, x1,y1,x2,y2, c1, c2, vertical=True):
+    """Reference per-scanline gradient (one draw.line per row/column) — kept for the benchmark."""
     steps = (y2-y1) if vertical else (x2-x1)
     for i in range(max(1,steps)):
         a = i/max(1,steps-1)
@@ -431,25 +877,175 @@ def _gradient(draw, x1,y1,x2,y2, c1, c2, vertical=True):
         if vertical: draw.line([(x1,y1+i),(x2,y1+i)],fill=col)
         else:        draw.line([(x1+i,y1),(x1+i,y2)],fill=col)
 
+def _ramp(stops, n, channels):
+    """n colours spread evenly across `stops`; same arithmetic as the scanline loop."""
+    c = np.array([tuple(s)[:channels] for s in stops], dtype=np.float64)
+    if len(c) == 1 or n == 1: return np.repeat(c[:1], n, axis=0).astype(np.uint8)
+    seg = len(c)-1
+    a   = np.arange(n)/(n-1)*seg if seg > 1 else np.arange(n)/(n-1)
+    k   = np.minimum(a.astype(np.int64), seg-1)
+    t   = (a-k)[:,None]
+    return (c[k]*(1-t)+c[k+1]*t).astype(np.uint8)
+
+def gradient_image(w, h, stops, vertical=True, alpha=False):
+    """w×h gradient strip built as one array; RGBA (alpha from the stops) when alpha=True."""
+    ch   = 4 if alpha else 3
+    col  = _ramp(stops, h if vertical else w, ch)
+    strip= Image.fromarray(col[:,None,:] if vertical else col[None,:,:], "RGBA" if alpha else "RGB")
+    return strip.resize((w,h), Image.NEAREST)
+
+def _gradient(img, x1,y1,x2,y2, *stops, vertical=True, alpha=False):
+    """Paste a linear gradient over the box in one shot. Covers the same pixels as
+    the old scanline loop (inclusive on the cross axis); any number of stops.
+    Colours are opaque unless alpha=True, which blends by the stops' 4th channel."""
+    steps = max(1, (y2-y1) if vertical else (x2-x1))
+    if alpha: stops = [tuple(s)+(255,)*(4-len(s)) for s in stops]
+    if vertical: w, h = abs(x2-x1)+1, steps
+    else:        w, h = steps, abs(y2-y1)+1
+    g = gradient_image(w, h, stops, vertical, alpha)
+    img.paste(g, (min(x1,x2) if vertical else x1, y1 if vertical else min(y1,y2)),
+              g if alpha else None)
+
+def bench_gradient(rounds=10):
+    """Micro-benchmark: full card background + accent bars, scanline loop vs arrays."""
+    W, H = CARD_W, CARD_H; th = THEMES["royal_gold"]
+    jobs = [(0,0,W,H//2, th["bg"],th["bg2"],True), (0,H//2,W,H, th["bg2"],th["bg3"],True),
+            (16,16,W-16,28, th["acc2"],th["acc"],False), (80,300,W-80,303, th["acc2"],th["acc"],False)]
+    def run(vec):
+        img = Image.new("RGB",(W,H)); d = ImageDraw.Draw(img)
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for x1,y1,x2,y2,c1,c2,v in jobs:
+                if vec: _gradient(img, x1,y1,x2,y2, c1,c2, vertical=v)
+                else:   _gradient_lines(d, x1,y1,x2,y2, c1,c2, vertical=v)
+        return (time.perf_counter()-t0)*1000/rounds, img.tobytes()
+    old_ms, a = run(False); new_ms, b = run(True)
+    return {"loop_ms":old_ms,"array_ms":new_ms,"speedup":old_ms/max(new_ms,1e-9),"identical":a==b}
+
 # ══════════════════════════════════════════════════════════════════
-#  INVITATION CARD GENERATOR  — v6 Beautiful Design
+#  RENDER STORE  (content-addressed files on disk, LRU by mtime)
 # ══════════════════════════════════════════════════════════════════
-def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
-    W, H = 1080, 1620   # 2:3 ratio — perfect for phone screens & sharing
+RENDER_CACHE_MB = 1024
+
+def _render_path(dg, ext=".png"):
+    return os.path.join(RENDER_CACHE_DIR, dg[:2], dg+ext)
+
+def _scan_render_cache():
+    files = []
+    if os.path.isdir(RENDER_CACHE_DIR):
+        for d in os.scandir(RENDER_CACHE_DIR):
+            if not d.is_dir(): continue
+            for e in os.scandir(d.path):
+                if e.name.endswith(".tmp"): continue
+                try: stt = e.stat()
+                except OSError: continue
+                files.append((stt.st_mtime, stt.st_size, e.path))
+    return files
+
+def _render_store():
+    def fresh():
+        files = _scan_render_cache()
+        return {"files":len(files),"bytes":sum(f[1] for f in files),"added":0,
+                "hits":0,"misses":0,"evicted":0,"lock":threading.Lock()}
+    return _store("render_disk", fresh)
+
+def render_cache_has(dg, ext=".png"):
+    return os.path.exists(_render_path(dg, ext))
+
+def render_cache_get(dg, ext=".png"):
+    p, ds = _render_path(dg, ext), _render_store()
+    try:
+        with open(p,"rb") as f: data = f.read()
+        os.utime(p)   # mark as recently used
+    except OSError:
+        ds["misses"] += 1; return None
+    ds["hits"] += 1; return data
+
+def render_cache_put(dg, data, ext=".png"):
+    p, ds = _render_path(dg, ext), _render_store()
+    os.makedirs(os.path.dirname(p), exist_ok=True)
+    tmp = f"{p}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp,"wb") as f: f.write(data)
+    os.replace(tmp, p)   # atomic — readers never see a partial file
+    with ds["lock"]:
+        ds["files"] += 1; ds["bytes"] += len(data); ds["added"] += len(data)
+        due = ds["bytes"] > RENDER_CACHE_MB*1e6 or ds["added"] > RENDER_CACHE_MB*1e6/8
+    if due: sweep_render_cache()
+
+def sweep_render_cache(max_mb=None):
+    """Rescan the store and delete least-recently-used files until it fits."""
+    cap, ds, files = (max_mb or RENDER_CACHE_MB)*1e6, _render_store(), _scan_render_cache()
+    total, gone = sum(f[1] for f in files), 0
+    if total > cap:
+        for _,size,path in sorted(files):
+            if total <= cap*0.9: break
+            try: os.remove(path); total -= size; gone += 1
+            except OSError: pass
+    with ds["lock"]:
+        ds["files"], ds["bytes"], ds["added"] = len(files)-gone, total, 0
+        ds["evicted"] += gone
+    return gone
+
+def render_cache_stats():
+    ds = _render_store(); n = ds["hits"]+ds["misses"]
+    return {"files":ds["files"],"mb":ds["bytes"]/1e6,"hits":ds["hits"],"misses":ds["misses"],
+            "evicted":ds["evicted"],"hit_rate":ds["hits"]/n if n else 0.0}
 
-    th  = THEMES.get(cfg.get("inv_theme","royal_gold"), THEMES["royal_gold"])
+# ══════════════════════════════════════════════════════════════════
+#  INVITATION CARD GENERATOR  — v6 Beautiful Design
+# ══════════════════════════════════════════════════════════════════
+CARD_W, CARD_H = 1080, 1620   # 2:3 ratio — perfect for phone screens & sharing
+CARD_LOGO_H    = 110
+CARD_BG_MAX    = 16             # cached theme/logo background layers (LRU)
+
+def _card_bg_cache():
+    return _lru("card_bg", CARD_BG_MAX)
+
+def _card_background(theme_key, logos):
+    """Everything above the first text line — a pure function of the theme and
+    logos — rendered once and handed out as a copy for every card."""
+    bc, key = _card_bg_cache(), (theme_key, tuple(logo_digest(lb) for lb in logos))
+    base = lru_get(bc, key)
+    if base is None: base = lru_put(bc, key, _draw_card_background(THEMES[theme_key], logos))
+    return base.copy()
+
+# ── Logos: decoded and resized once per process ──
+LOGO_CACHE_MAX = 16
+
+def logo_digest(src):
+    """Logos arrive as asset refs or raw bytes; a ref *is* the bytes' SHA-1,
+    so both forms key every cache identically."""
+    return src if isinstance(src,str) else hashlib.sha1(src).hexdigest()
+
+def _logo_cache():
+    return _lru("logos", LOGO_CACHE_MAX)
+
+def logo_image(src):
+    """Ready-to-paste RGBA logo, CARD_LOGO_H px tall, or None if unreadable.
+    Keyed by content digest — a new upload is a new key, nothing to invalidate.
+    The returned image is shared; callers must not draw on it."""
+    lc, key = _logo_cache(), logo_digest(src)
+    li = lru_get(lc, key, _MISS)   # None is cached too: an unreadable logo stays unread
+    if li is not _MISS: return li
+    try:
+        li = Image.open(io.BytesIO(asset_bytes(src) if isinstance(src,str) else src)).convert("RGBA")
+        r  = CARD_LOGO_H/li.height
+        li = li.resize((max(1,int(li.width*r)),CARD_LOGO_H),Image.LANCZOS)
+    except: li = None
+    return lru_put(lc, key, li)
+
+def _draw_card_background(th, logos):
+    W, H = CARD_W, CARD_H
     bg  = th["bg"];   bg2 = th["bg2"];  bg3 = th["bg3"]
-    acc = th["acc"];  acc2= th["acc2"]
-    txt = th["txt"];  sub = th["sub"];  brd = th["brd"]
-    bbg = th["badge_bg"]; btxt= th["badge_txt"]
+    acc = th["acc"];  acc2= th["acc2"]; brd = th["brd"]
 
     img  = Image.new("RGB",(W,H),bg)
     draw = ImageDraw.Draw(img)
 
     # ── Full 3-stop gradient background ──────────────────────────
     mid = H//2
-    _gradient(draw, 0,0,W,mid,   bg,  bg2, vertical=True)
-    _gradient(draw, 0,mid,W,H,   bg2, bg3, vertical=True)
+    _gradient(img, 0,0,W,mid,   bg,  bg2, vertical=True)
+    _gradient(img, 0,mid,W,H,   bg2, bg3, vertical=True)
 
     # ── Decorative geometric background pattern ───────────────────
     # Large faint circles
@@ -467,8 +1063,8 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
     _rr(draw, 26,26, W-26,H-26, 28, bg,  outline=brd,  ow=1)
 
     # ── Top gradient accent bar ───────────────────────────────────
-    _gradient(draw, 16,16, W-16,28, acc2,acc, vertical=False)
-    _gradient(draw, 16,H-28, W-16,H-16, acc,acc2, vertical=False)
+    _gradient(img, 16,16, W-16,28, acc2,acc, vertical=False)
+    _gradient(img, 16,H-28, W-16,H-16, acc,acc2, vertical=False)
 
     # ── Corner diamond ornaments ─────────────────────────────────
     for cx,cy in [(16+28,16+28),(W-16-28,16+28),(16+28,H-16-28),(W-16-28,H-16-28)]:
@@ -480,16 +1076,8 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
     y = 70  # Y cursor
 
     # ── Logos ────────────────────────────────────────────────────
-    LH   = 110
-    lraw = [b for b in [l1,l2,l3] if b]
-    limgs= []
-    for lb in lraw:
-        try:
-            li = Image.open(io.BytesIO(lb)).convert("RGBA")
-            r  = LH/li.height
-            li = li.resize((max(1,int(li.width*r)),LH),Image.LANCZOS)
-            limgs.append(li)
-        except: pass
+    LH   = CARD_LOGO_H
+    limgs= [li for li in map(logo_image, logos) if li is not None]
 
     if limgs:
         gap   = 48
@@ -501,7 +1089,23 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
         # Elegant graduation cap symbol
         cap_font = _fnt(90)
         draw.text((W//2, y+LH//2), "🎓", font=cap_font, fill=acc, anchor="mm")
-    y += LH + 16
+    return img
+
+def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
+    W, H = CARD_W, CARD_H
+
+    tkey = cfg.get("inv_theme","royal_gold")
+    if tkey not in THEMES: tkey = "royal_gold"
+    th  = THEMES[tkey]
+    bg  = th["bg"];   bg2 = th["bg2"];  bg3 = th["bg3"]
+    acc = th["acc"];  acc2= th["acc2"]
+    txt = th["txt"];  sub = th["sub"];  brd = th["brd"]
+    bbg = th["badge_bg"]; btxt= th["badge_txt"]
+
+    # ── Cached theme background + logos ───────────────────────────
+    img  = _card_background(tkey, [b for b in [l1,l2,l3] if b])
+    draw = ImageDraw.Draw(img)
+    y    = 70 + CARD_LOGO_H + 16
 
     # ── Organizer name  ───────────────────────────────────────────
     org = cfg.get("organizer","")
@@ -511,7 +1115,7 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
         y += 38
 
     # ── Gold rule line ────────────────────────────────────────────
-    _gradient(draw, 80,y, W-80,y+3, acc2,acc, vertical=False); y += 14
+    _gradient(img, 80,y, W-80,y+3, acc2,acc, vertical=False); y += 14
 
     # ── "INVITATION" word ─────────────────────────────────────────
     draw.text((W//2,y), "✦  I N V I T A T I O N  ✦",
@@ -550,7 +1154,7 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
     # Glowing name box
     _rr(draw, 44,y,W-44,y+name_h, 22, bg3, outline=acc, ow=3)
     # Inner shimmer
-    _gradient(draw, 46,y+2, W-46,y+name_h//3, (*acc,8), (*bg3,0), vertical=True)
+    _gradient(img, 46,y+2, W-46,y+name_h//3, (*acc,8), (*bg3,0), vertical=True)
 
     ny = y + (name_h - len(nm_lines)*72)//2
     for ln in nm_lines:
@@ -562,7 +1166,7 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
     cb   = draw.textbbox((0,0), cat_text, font=_fnt(30,True))
     cw   = cb[2]-cb[0]+90
     bx1  = W//2-cw//2; bx2 = W//2+cw//2
-    _gradient(draw, bx1,y, bx2,y+56, acc,acc2, vertical=False)
+    _gradient(img, bx1,y, bx2,y+56, acc,acc2, vertical=False)
     # Round corners manually
     for corner_x,corner_y in [(bx1,y),(bx2-56,y),(bx1,y+2),(bx2-56,y+2)]:
         pass  # gradient handles fill
@@ -618,7 +1222,7 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
     rx1 = W//2-rw//2; rx2 = W//2+rw//2
     _rr(draw, rx1,y, rx2,y+62, 31, bbg)
     # Small shine strip
-    _gradient(draw, rx1+4,y+4, rx2-4,y+18, (*txt,60),(*txt,0), vertical=True)
+    _gradient(img, rx1+4,y+4, rx2-4,y+18, (*txt,60),(*txt,0), vertical=True)
     draw.text((W//2,y+31), reg_text, font=rf_font, fill=btxt, anchor="mm"); y+=78
 
     # ── "Officially Registered" stamp ────────────────────────────
@@ -627,8 +1231,8 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
 
     # ── Bottom bar ────────────────────────────────────────────────
     bar_y = H-62
-    _gradient(draw, 16,bar_y, W-16,H-16, brd,bg2, vertical=True)
-    _gradient(draw, 16,bar_y, W-16,bar_y+3, acc,acc2, vertical=False)
+    _gradient(img, 16,bar_y, W-16,H-16, brd,bg2, vertical=True)
+    _gradient(img, 16,bar_y, W-16,bar_y+3, acc,acc2, vertical=False)
     footer_str = f"{cfg.get('organizer','')}  •  {cfg.get('event_date','')}"
     draw.text((W//2, bar_y+(H-16-bar_y)//2), footer_str,
               font=_fnt(21), fill=acc, anchor="mm")
@@ -637,45 +1241,292 @@ def generate_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
     img.save(buf, format="PNG", dpi=(150,150))
     return buf.getvalue()
 
+# ── Card render cache ──
+CARD_CFG_FIELDS = ("inv_theme","organizer","event_name","event_topic","event_date","event_venue")
+CARD_PREVIEW_MAX = 32   # rendered cards kept per process (LRU)
+
+def card_digest(rec, cfg, logos):
+    """Everything a card depends on: record, the config fields read by the
+    renderer and each logo's digest. Same digest → byte-identical PNG."""
+    return data_version([str(rec.get(k,"") or "") for k in CSV_HEADERS],
+                        [cfg.get(k) for k in CARD_CFG_FIELDS],
+                        [logo_digest(lb) if lb else None for lb in logos])
+
+def _card_png_cache():
+    return _lru("card_png", CARD_PREVIEW_MAX)
+
+def card_png(rec, cfg, logos):
+    """Card PNG from the render store, rendering and storing it on a miss."""
+    dg = card_digest(rec, cfg, logos)
+    png = render_cache_get(dg)
+    if png is None:
+        png = generate_invitation_card(rec, cfg, *logos); render_cache_put(dg, png)
+    return png
+
+def cached_invitation_card(rec, cfg, l1=None, l2=None, l3=None):
+    """Card PNG via the in-memory LRU (keyed on card_digest), then the render store."""
+    cc, key = _card_png_cache(), card_digest(rec, cfg, (l1,l2,l3))
+    png = lru_get(cc, key)
+    return png if png is not None else lru_put(cc, key, card_png(rec, cfg, (l1,l2,l3)))
+
+def card_png_stats():
+    cc = _card_png_cache()
+    with cc["lock"]: mb = sum(map(len,cc["items"].values()))/1e6
+    return dict(lru_stats(cc), mb=mb)
+
+# ── Background card rendering (form submits) ──
+CARD_RENDER_THREADS = 2      # renderer threads per server process
+CARD_JOBS_MAX       = 128    # unclaimed jobs kept for the confirmation view
+LATENCY_SAMPLES     = 2000   # recent submit/render timings kept for percentiles
+
+def _card_queue():
+    return _store("card_queue", lambda: {
+        "pool":ThreadPoolExecutor(CARD_RENDER_THREADS,thread_name_prefix="card"),
+        "jobs":OrderedDict(),"lock":threading.Lock(),
+        "submit_ms":deque(maxlen=LATENCY_SAMPLES),"render_ms":deque(maxlen=LATENCY_SAMPLES)})
+
+def _card_job(reg, q, args):
+    _THREAD_STORES.reg = reg   # pool threads have no script context of their own
+    t0 = time.perf_counter(); png = cached_invitation_card(*args)
+    q["render_ms"].append((time.perf_counter()-t0)*1000)
+    return png
+
+def submit_card(job_id, rec, cfg, l1=None, l2=None, l3=None):
+    """Queue a card render; pick it up later with card_result(job_id)."""
+    q, args = _card_queue(), (rec, cfg, l1, l2, l3)
+    fut = q["pool"].submit(_card_job, _process_stores(), q, args)
+    with q["lock"]:
+        q["jobs"][job_id] = (fut, args)
+        while len(q["jobs"]) > CARD_JOBS_MAX: q["jobs"].popitem(last=False)
+
+def card_result(job_id, fallback, timeout=0):
+    """The card PNG, or None while it is still rendering (waits up to timeout s).
+    A failed or already-forgotten job is rendered here from `fallback` args."""
+    q = _card_queue()
+    with q["lock"]: job = q["jobs"].get(job_id)
+    if job is None: return cached_invitation_card(*fallback)
+    fut, args = job
+    try: png = fut.result(timeout=timeout or None) if timeout or fut.done() else None
+    except FutureTimeout: return None
+    except Exception: png = cached_invitation_card(*args)
+    if png is not None:
+        with q["lock"]: q["jobs"].pop(job_id, None)
+    return png
+
+def record_submit_latency(ms):
+    _card_queue()["submit_ms"].append(ms)
+
+def _pct(vals, p):
+    v = sorted(vals)
+    return v[min(len(v)-1,int(len(v)*p/100))] if v else 0.0
+
+def submit_latency_stats():
+    q = _card_queue(); sub, ren = list(q["submit_ms"]), list(q["render_ms"])
+    return {"n":len(sub),"p50":_pct(sub,50),"p99":_pct(sub,99),
+            "render_p50":_pct(ren,50),"render_p99":_pct(ren,99),
+            "pending":sum(1 for f,_ in list(q["jobs"].values()) if not f.done())}
+
 # ══════════════════════════════════════════════════════════════════
 #  CERTIFICATE GENERATOR
 # ══════════════════════════════════════════════════════════════════
 def load_pil_font(name, size):
-    for path in FONTS.get(name,["DejaVuSans-Bold.ttf"]):
-        try: return ImageFont.truetype(path,size)
-        except: pass
-    return ImageFont.load_default()
+    return _get_font(name, size, False, FONTS.get(name,["DejaVuSans-Bold.ttf"]))
 
 def hex_rgba(h,a=255):
     h=h.lstrip("#")
     return (int(h[0:2],16),int(h[2:4],16),int(h[4:6],16),a)
 
-def generate_cert(name, template, cfg_c):
-    img=Image.open(io.BytesIO(template)).convert("RGBA")
-    w,h=img.size
-    font=load_pil_font(cfg_c["font"],cfg_c["size"])
+CERT_TPL_MAX = 2   # decoded templates kept per process (full-size RGBA each)
+
+def _cert_template(template):
+    """Decoded RGBA template, cached per process by content digest."""
+    tc, key = _lru("cert_tpl", CERT_TPL_MAX), hashlib.sha1(template).hexdigest()
+    img = lru_get(tc, key)
+    return img if img is not None else lru_put(tc, key, Image.open(io.BytesIO(template)).convert("RGBA"))
+
+def compile_cert(template, cfg_c, width=None):
+    """Renderer for one template + layout. Decoding, font lookup and placement
+    happen once here; render(name) composites only the name's bounding box
+    onto an RGB copy of the template and returns the PIL image.
+    With width the template and font are scaled down first (thumbnails)."""
+    base = _cert_template(template)
+    w,h  = base.size; size = cfg_c["size"]
+    if width and width < w:
+        base = base.resize((width,max(1,round(h*width/w))),Image.LANCZOS)
+        size = max(1,round(size*width/w)); w,h = base.size
+    font = load_pil_font(cfg_c["font"],size)
+    fill = hex_rgba(cfg_c["color"])
+    meas = ImageDraw.Draw(Image.new("RGBA",(1,1)))
+    def render(name):
+        x0,y0=cert_text_origin(meas,name,font,w,h,cfg_c)
+        ink=meas.textbbox((x0,y0),name,font=font)
+        box=(max(0,ink[0]-2),max(0,ink[1]-2),min(w,ink[2]+2),min(h,ink[3]+2))
+        out=base.convert("RGB")
+        if box[2]>box[0] and box[3]>box[1]:
+            layer=Image.new("RGBA",(box[2]-box[0],box[3]-box[1]),(255,255,255,0))
+            ImageDraw.Draw(layer).text((x0-box[0],y0-box[1]),name,font=font,fill=fill)
+            region=base.crop(box); region.alpha_composite(layer)
+            out.paste(region.convert("RGB"),box[:2])
+        return out
+    return render
+
+def cert_text_origin(draw, name, font, w, h, cfg_c):
+    """Top-left (anchor "la") that centres the name's box on text_x/text_y %."""
     px=int(w*cfg_c["x"]/100); py=int(h*cfg_c["y"]/100)
-    layer=Image.new("RGBA",img.size,(255,255,255,0))
-    draw=ImageDraw.Draw(layer)
     bbox=draw.textbbox((0,0),name,font=font)
-    tw,th2=bbox[2]-bbox[0],bbox[3]-bbox[1]
-    draw.text((px-tw//2,py-th2//2),name,font=font,fill=hex_rgba(cfg_c["color"]))
-    out=Image.alpha_composite(img,layer).convert("RGB")
-    buf=io.BytesIO(); out.save(buf,format="PNG",dpi=(300,300))
+    return px-(bbox[2]-bbox[0])//2, py-(bbox[3]-bbox[1])//2
+
+def cert_png(img):
+    buf=io.BytesIO(); img.save(buf,format="PNG",dpi=(300,300))
     return buf.getvalue()
 
-def cert_to_pdf(png, name):
+def generate_cert(name, template, cfg_c):
+    return cert_png(compile_cert(template,cfg_c)(name))
+
+# ── Preview-grid thumbnails ──
+CERT_THUMB_W   = 640   # px — grid previews only; downloads are full resolution
+CERT_THUMB_MAX = 96    # thumbnails kept per process (LRU)
+
+def _cert_thumb_cache():
+    return _lru("cert_thumbs", CERT_THUMB_MAX)
+
+def cert_thumbnails(template, cfg_c, names):
+    """Low-res JPEG previews cached per (name, template digest, layout). The
+    thumbnail-scale renderer is only compiled when something is missing."""
+    tc, tdig = _cert_thumb_cache(), hashlib.sha1(template).hexdigest()
+    layout, render, out = data_version(cfg_c, CERT_THUMB_W), None, []
+    for nm in names:
+        key = (nm, tdig, layout)
+        jpg = lru_get(tc, key)
+        if jpg is None:
+            if render is None: render = compile_cert(template, cfg_c, width=CERT_THUMB_W)
+            buf = io.BytesIO(); render(nm).save(buf,format="JPEG",quality=85)
+            jpg = lru_put(tc, key, buf.getvalue())
+        out.append(jpg)
+    return out
+
+def cert_to_pdf(img, name, event_name=None, jpeg_quality=None):
+    """Single-page PDF straight from the rendered image (PNG bytes also accepted).
+    With jpeg_quality the page image is embedded as JPEG instead of lossless."""
+    if isinstance(img,(bytes,bytearray)): img=Image.open(io.BytesIO(img))
+    if img.mode!="RGB": img=img.convert("RGB")
     buf=io.BytesIO(); pw,ph=landscape(A4)
     c=pdf_canvas.Canvas(buf,pagesize=(pw,ph))
-    img=Image.open(io.BytesIO(png)).convert("RGB")
     iw,ih=img.size; sc=min(pw/iw,ph/ih); nw,nh=iw*sc,ih*sc
-    tmp=io.BytesIO(); img.save(tmp,format="PNG"); tmp.seek(0)
-    c.drawImage(ImageReader(tmp),(pw-nw)/2,(ph-nh)/2,nw,nh,mask="auto")
+    if jpeg_quality:
+        tmp=io.BytesIO(); img.save(tmp,format="JPEG",quality=jpeg_quality); tmp.seek(0)
+        src=ImageReader(tmp)
+    else: src=ImageReader(img)
+    c.drawImage(src,(pw-nw)/2,(ph-nh)/2,nw,nh,mask="auto")
+    _pdf_footer(c,pw,name,event_name)
+    c.save(); return buf.getvalue()
+
+def _pdf_font(font):
+    """Register the PIL font's TrueType file with ReportLab → font name."""
+    path = getattr(font,"path",None)
+    if not path: return "Helvetica-Bold"
+    fname = "Cert-"+hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    if fname not in pdfmetrics.getRegisteredFontNames():
+        try: pdfmetrics.registerFont(TTFont(fname, path))
+        except Exception: return "Helvetica-Bold"
+    return fname
+
+def _pdf_footer(c, pw, name, event_name):
     c.setFont("Helvetica-Bold",9); c.setFillColorRGB(.5,.5,.5)
     c.drawCentredString(pw/2,14,
-        f"{name}  |  {st.session_state.event_name}  |  {datetime.now().strftime('%Y-%m-%d')}")
+        f"{name}  |  {event_name or st.session_state.event_name}  |  {datetime.now().strftime('%Y-%m-%d')}")
+
+def pdf_cert_context(template, cfg_c, jpeg_quality=None):
+    """Template + layout state for vector-text PDFs, built once per batch. The
+    template is kept lossless, or pre-encoded once as JPEG when jpeg_quality is set."""
+    base = _cert_template(template).convert("RGB")
+    iw,ih= base.size; pw,ph=landscape(A4); sc=min(pw/iw,ph/ih)
+    font = load_pil_font(cfg_c["font"],cfg_c["size"])
+    ctx  = {"iw":iw,"ih":ih,"pw":pw,"ph":ph,"sc":sc,"ox":(pw-iw*sc)/2,"oy":(ph-ih*sc)/2,
+            "cfg":cfg_c,"font":font,"fname":_pdf_font(font),"rgb":hex_rgba(cfg_c["color"])[:3],
+            "asc":font.getmetrics()[0] if hasattr(font,"getmetrics") else cfg_c["size"],
+            "meas":ImageDraw.Draw(Image.new("RGB",(1,1))),"img":base,"jpeg":None}
+    if jpeg_quality:
+        tmp=io.BytesIO(); base.save(tmp,format="JPEG",quality=jpeg_quality); ctx["jpeg"]=tmp.getvalue()
+        ctx["jpeg_path"]=_pdf_jpeg_file(ctx["jpeg"])
+    return ctx
+
+def _pdf_jpeg_file(data):
+    """The JPEG template as a .jpg file in the spool dir. drawImage() embeds a JPEG
+    file as-is, while an in-memory ImageReader is decoded just to be hashed.
+    None if it can't be written."""
+    p = os.path.join(SPOOL_DIR, f"tpl_{hashlib.sha1(data).hexdigest()}.jpg")
+    try:
+        if os.path.exists(p): os.utime(p)   # keep it clear of sweep_spools()
+        else:
+            os.makedirs(SPOOL_DIR, exist_ok=True); tmp = f"{p}.{os.getpid()}.tmp"
+            with open(tmp,"wb") as f: f.write(data)
+            os.replace(tmp, p)
+        return p
+    except OSError: return None
+
+def _pdf_cert_page(c, ctx, name, bg, event_name):
+    """Template + the name as TrueType text at the PNG renderer's position. The
+    template comes from ctx["form"] when the canvas holds one, else from `bg`."""
+    sc,ox,oy,ih = ctx["sc"],ctx["ox"],ctx["oy"],ctx["ih"]
+    if ctx.get("form"): c.doForm(ctx["form"])
+    else: c.drawImage(bg,ox,oy,ctx["iw"]*sc,ih*sc,mask="auto")
+    x0,y0 = cert_text_origin(ctx["meas"],name,ctx["font"],ctx["iw"],ih,ctx["cfg"])
+    c.setFont(ctx["fname"],ctx["cfg"]["size"]*sc); c.setFillColorRGB(*(v/255 for v in ctx["rgb"]))
+    c.drawString(ox+x0*sc, oy+(ih-y0-ctx["asc"])*sc, name)
+    _pdf_footer(c,ctx["pw"],name,event_name)
+
+def _pdf_bg(ctx):
+    if ctx.get("jpeg_path"): return ctx["jpeg_path"]
+    return ImageReader(io.BytesIO(ctx["jpeg"]) if ctx["jpeg"] else ctx["img"])
+
+def cert_vector_pdf(ctx, name, event_name=None):
+    """Single-page certificate PDF with the name as real, selectable text."""
+    buf=io.BytesIO(); c=pdf_canvas.Canvas(buf,pagesize=(ctx["pw"],ctx["ph"]))
+    c.setTitle(f"Certificate — {name}")
+    _pdf_cert_page(c,ctx,name,_pdf_bg(ctx),event_name)
     c.save(); return buf.getvalue()
 
+def cert_booklet_pdf(template, cfg_c, names, out, event_name=None, progress=None):
+    """Every certificate as one page of a single PDF written to `out`. The
+    template is drawn once into a form that every page reuses, so it is
+    encoded once per booklet; each name is selectable vector text."""
+    ctx = pdf_cert_context(template, cfg_c)
+    c = pdf_canvas.Canvas(out,pagesize=(ctx["pw"],ctx["ph"]))
+    c.setTitle(f"{event_name or st.session_state.event_name} — Certificates")
+    c.beginForm("certTemplate")
+    c.drawImage(_pdf_bg(ctx),ctx["ox"],ctx["oy"],ctx["iw"]*ctx["sc"],ctx["ih"]*ctx["sc"],mask="auto")
+    c.endForm(); ctx["form"] = "certTemplate"
+    for i,nm in enumerate(names):
+        _pdf_cert_page(c,ctx,nm,None,event_name); c.showPage()
+        if progress: progress(i)
+    c.save()
+
+CERT_STAGES = ("render","png","pdf")
+
+def cert_outputs(tdig, cfg_c, name, do_png, do_pdf, event_name, jpeg_quality=None, vector=False):
+    """[(digest, ext)] of the files one attendee's certificate produces. The PDF
+    footer prints today's date, so PDFs are only reused within the same day."""
+    out = []
+    if do_png: out.append((data_version("cert-png",tdig,cfg_c,name),".png"))
+    if do_pdf: out.append((data_version("cert-pdf",tdig,cfg_c,name,event_name,jpeg_quality,vector,
+                                        datetime.now().strftime('%Y-%m-%d')),".pdf"))
+    return out
+
+def render_cert_files(render, name, do_png=True, do_pdf=True, event_name=None,
+                      jpeg_quality=None, pdf_ctx=None):
+    """Render once and encode from the same image → (png, pdf, seconds per stage).
+    With pdf_ctx the PDF is vector text over the template and needs no raster."""
+    t0=time.perf_counter()
+    img=render(name) if do_png or (do_pdf and not pdf_ctx) else None
+    t1=time.perf_counter(); png=cert_png(img) if do_png else None
+    t2=time.perf_counter()
+    pdf=None
+    if do_pdf: pdf=(cert_vector_pdf(pdf_ctx,name,event_name) if pdf_ctx
+                    else cert_to_pdf(img,name,event_name,jpeg_quality))
+    t3=time.perf_counter()
+    return png, pdf, (t1-t0, t2-t1, t3-t2)
+
 def make_qr(url):
     qr=qrcode.QRCode(version=1,error_correction=qrcode.constants.ERROR_CORRECT_H,
                      box_size=10,border=4)
@@ -689,62 +1540,193 @@ def cur_cfg():
             "size":st.session_state.font_size,"color":st.session_state.text_color,
             "font":st.session_state.selected_font}
 
+# ══════════════════════════════════════════════════════════════════
+#  PARALLEL BATCH ENGINE  (process pool)
+# ══════════════════════════════════════════════════════════════════
+_batch_state  = None   # per-worker payload, installed once by _batch_init
+
+def _pool_context():
+    """Forked workers inherit this script's functions; where fork is unavailable
+    (Windows) batches run in-process instead."""
+    try: return multiprocessing.get_context("fork")
+    except ValueError: return None
+
+def _batch_init(payload, warm=None):
+    # Tasks are unpickled against whichever script module was __main__ at fork
+    # time, so the payload goes there. Fresh stores keep workers off any lock a
+    # server thread may have held when we forked.
+    g = vars(sys.modules["__main__"])
+    g["_batch_state"] = payload; g["_LOCAL_STORES"] = {"lock":threading.Lock()}
+    if warm: g[warm]()
+
+BATCH_WINDOW = 2   # tasks in flight per worker — finished results wait in memory until yielded
+
+def batch_map(task, payload, items, workers=BATCH_WORKERS, warm=None):
+    """Yield task(item) for every item, in order, fanned out over a process pool.
+    `payload` is shipped to each worker once, not once per task; `warm` names a
+    function each worker runs once after receiving it (preload fonts, images...).
+    At most workers*BATCH_WINDOW tasks are in flight, so memory stays bounded."""
+    global _batch_state
+    items = list(items); done = 0
+    if not items: return
+    ctx = _pool_context() if workers > 1 and len(items) > 1 else None
+    ex  = None
+    if ctx is not None:
+        try: ex = ProcessPoolExecutor(min(workers,len(items)), mp_context=ctx,
+                                      initializer=_batch_init, initargs=(payload,warm))
+        except (OSError, ValueError, AttributeError): ex = None   # no pool here — run in-process
+    if ex is not None:
+        window, nxt, pending = workers*BATCH_WINDOW, 0, deque()
+        try:
+            while done < len(items):
+                while nxt < len(items) and len(pending) < window:
+                    pending.append(ex.submit(task, items[nxt])); nxt += 1
+                r = pending.popleft().result(); done += 1
+                yield r
+            return
+        except (BrokenProcessPool, pickle.PicklingError) as e:
+            if done:   # a worker died mid-batch (often out of memory) — say so
+                st.warning(f"⚠️ Worker pool failed after {done}/{len(items)} items "
+                           f"({type(e).__name__}) — finishing the rest in this process, more slowly.")
+        finally: ex.shutdown(wait=True, cancel_futures=True)
+    _batch_state = payload
+    try:
+        if warm: globals()[warm]()
+        for it in items[done:]: yield task(it)
+    finally: _batch_state = None
+
+def _card_warm():
+    # One throwaway card loads the fonts, decodes/resizes the logos and caches
+    # the theme background before the first real record arrives.
+    b = _batch_state
+    generate_invitation_card({"name":"Warm Up","category":"Participant"}, b["cfg"], *b["logos"])
+
+def _card_task(rec):
+    b = _batch_state
+    return generate_invitation_card(rec, b["cfg"], *b["logos"])
+
+def _cert_warm():
+    b = _batch_state; b["render"] = compile_cert(b["template"], b["cfg"])
+    b["pdf_ctx"] = pdf_cert_context(b["template"], b["cfg"], b["jpeg"]) if b["pdf"] and b["vector"] else None
+
+def _cert_task(name):
+    b = _batch_state
+    return render_cert_files(b["render"], name, b["png"], b["pdf"], b["event"], b["jpeg"],
+                             b["pdf_ctx"])
+
+# ══════════════════════════════════════════════════════════════════
+#  INCREMENTAL EXPORTS  (manifest of what the last export contained)
+# ══════════════════════════════════════════════════════════════════
+def reg_key(rec):
+    return rec.get("ref_no") or rec.get("name","")
+
+def _sig(outs):
+    return "+".join(dg+ext for dg,ext in outs)
+
+def _manifest_path(kind):
+    return os.path.join(RENDER_CACHE_DIR, f"manifest_{kind}.json")
+
+def load_manifest(kind):
+    try:
+        with open(_manifest_path(kind),encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def save_manifest(kind, keys, outputs):
+    """Record each registration's output digests as of this export."""
+    os.makedirs(RENDER_CACHE_DIR, exist_ok=True)
+    p = _manifest_path(kind); tmp = p+".tmp"
+    with open(tmp,"w",encoding="utf-8") as f:
+        json.dump({k:_sig(o) for k,o in zip(keys,outputs)}, f)
+    os.replace(tmp, p)
+
+def plan_export(kind, keys, outputs, delta_only=False):
+    """outputs[i] = [(digest, ext), ...] for registration keys[i] → (include, todo).
+    include: records going into the archive — all, or with delta_only just those
+    new/changed since the last export. todo: the included records with an output
+    missing from the render store, i.e. the only ones that need rendering."""
+    man = load_manifest(kind) if delta_only else {}
+    include = [i for i,(k,o) in enumerate(zip(keys,outputs)) if not delta_only or man.get(k)!=_sig(o)]
+    todo = [i for i in include if not all(render_cache_has(dg,ext) for dg,ext in outputs[i])]
+    return include, todo
+
 # ══════════════════════════════════════════════════════════════════
 #  EXCEL REPORT
 # ══════════════════════════════════════════════════════════════════
-def build_excel(regs):
-    wb=openpyxl.Workbook()
-    hf=PatternFill("solid",fgColor="1E1B4B"); hf2=PatternFill("solid",fgColor="0B132B")
-    hfn=XFont(bold=True,color="FFFFFF",size=12)
-    bdr=Border(bottom=Side(style="thin",color="334466"))
-    ws=wb.active; ws.title="Registrations"
-    ws.merge_cells("A1:I1"); t=ws["A1"]
-    t.value=f"  {st.session_state.event_name} — Registration Data"
-    t.font=XFont(bold=True,color="FFD159",size=14); t.fill=hf2
-    t.alignment=Alignment(horizontal="center",vertical="center"); ws.row_dimensions[1].height=34
-    ws.merge_cells("A2:I2"); info=ws["A2"]
-    try: day=datetime.strptime(st.session_state.event_date,"%Y-%m-%d").strftime("%A")
-    except: day=""
-    info.value=(f"Date:{st.session_state.event_date}({day}) | "
-                f"Venue:{st.session_state.event_venue} | "
-                f"Organizer:{st.session_state.organizer} | Total:{len(regs)}")
-    info.font=XFont(color="7ECEFD",size=10); info.fill=hf
-    info.alignment=Alignment(horizontal="center"); ws.row_dimensions[2].height=18
+# Named styles shared by every cell of a kind — one style record each in the
+# file instead of fresh Font/Fill/Alignment objects per cell.
+_XL_DARK, _XL_HEAD = "0B132B", "1E1B4B"
+_XL_STYLES = {
+    "xl_title":  dict(font=dict(bold=True,color="FFD159",size=14),fill=_XL_DARK,align=("center","center")),
+    "xl_info":   dict(font=dict(color="7ECEFD",size=10),fill=_XL_HEAD,align=("center",None)),
+    "xl_head":   dict(font=dict(bold=True,color="FFFFFF",size=12),fill=_XL_HEAD,align=("center",None)),
+    "xl_stitle": dict(font=dict(bold=True,color="FFD159",size=13),fill=_XL_DARK,align=("center",None)),
+    "xl_scat":   dict(font=dict(bold=True,color="FFD159"),fill=_XL_HEAD),
+    "xl_sval":   dict(font=dict(color="E0E0E0"),fill=_XL_HEAD),
+}
+for _i,_bg in enumerate(("0F1B35","1A2550")):   # even / odd data rows
+    for _h in ("center","left"):
+        _XL_STYLES[f"xl_row{_i}_{_h}"] = dict(font=dict(color="E0E0E0",size=11),fill=_bg,
+                                             align=(_h,"center"),border=True)
+
+def _xl_named_styles(wb):
+    for name,sp in _XL_STYLES.items():
+        ns=NamedStyle(name=name,font=XFont(**sp["font"]),fill=PatternFill("solid",fgColor=sp["fill"]))
+        if "align" in sp: ns.alignment=Alignment(horizontal=sp["align"][0],vertical=sp["align"][1])
+        if sp.get("border"): ns.border=Border(bottom=Side(style="thin",color="334466"))
+        wb.add_named_style(ns)
+
+def _xl_cell(ws, value, style):
+    c=WriteOnlyCell(ws,value=value); c.style=style; return c
+
+def build_excel(regs, counts=None):
+    """Registrations + Summary workbook, streamed with openpyxl's write-only mode.
+    counts: {category: n} from reg_counts(); grouped from regs when omitted."""
+    wb=openpyxl.Workbook(write_only=True); _xl_named_styles(wb)
+    ws=wb.create_sheet("Registrations")
     cols=[("Ref No",12),("#",5),("Full Name",28),("Roll No",14),
           ("Department",22),("Batch",12),("Category",16),("Date",14),("Time",10)]
-    for ci,(h,w) in enumerate(cols,1):
-        cell=ws.cell(row=3,column=ci,value=h)
-        cell.font=hfn; cell.fill=hf
-        cell.alignment=Alignment(horizontal="center")
-        ws.column_dimensions[get_column_letter(ci)].width=w
-    ws.row_dimensions[3].height=22
+    for ci,(_,w) in enumerate(cols,1): ws.column_dimensions[get_column_letter(ci)].width=w
+    ws.merged_cells.add("A1:I1"); ws.merged_cells.add("A2:I2")
+    try: day=datetime.strptime(st.session_state.event_date,"%Y-%m-%d").strftime("%A")
+    except: day=""
+    for ri,h in ((1,34),(2,18),(3,22)): ws.row_dimensions[ri].height=h
+    ws.append([_xl_cell(ws,f"  {st.session_state.event_name} — Registration Data","xl_title")])
+    ws.append([_xl_cell(ws,f"Date:{st.session_state.event_date}({day}) | "
+                           f"Venue:{st.session_state.event_venue} | "
+                           f"Organizer:{st.session_state.organizer} | Total:{len(regs)}","xl_info")])
+    ws.append([_xl_cell(ws,h,"xl_head") for h,_ in cols])
+    keys=("ref_no",None,"name","roll_no","department","batch","category","date","time")
     for ri,rec in enumerate(regs,4):
-        alt=PatternFill("solid",fgColor="0F1B35" if ri%2==0 else "1A2550")
-        vals=[rec.get("ref_no",""),ri-3,rec.get("name",""),rec.get("roll_no",""),
-              rec.get("department",""),rec.get("batch",""),rec.get("category",""),
-              rec.get("date",""),rec.get("time","")]
-        for ci,val in enumerate(vals,1):
-            c=ws.cell(row=ri,column=ci,value=val)
-            c.font=XFont(color="E0E0E0",size=11); c.fill=alt; c.border=bdr
-            c.alignment=Alignment(horizontal="center" if ci in[1,2,7,8,9] else "left",vertical="center")
-        ws.row_dimensions[ri].height=20
+        ws.row_dimensions[ri].height=20; p=f"xl_row{ri%2}_"
+        ws.append([_xl_cell(ws,ri-3 if k is None else rec.get(k,""),
+                            p+("center" if ci in (1,2,7,8,9) else "left"))
+                   for ci,k in enumerate(keys,1)])
     ws2=wb.create_sheet("Summary")
-    ws2.merge_cells("A1:C1"); t2=ws2["A1"]; t2.value="Category Summary"
-    t2.font=XFont(bold=True,color="FFD159",size=13); t2.fill=hf2
-    t2.alignment=Alignment(horizontal="center"); ws2.row_dimensions[1].height=28
-    for ci,h in enumerate(["Category","Count","Members"],1):
-        c=ws2.cell(row=2,column=ci,value=h); c.font=hfn; c.fill=hf
-        c.alignment=Alignment(horizontal="center")
+    for col,w in (("A",20),("B",10),("C",80)): ws2.column_dimensions[col].width=w
+    ws2.merged_cells.add("A1:C1"); ws2.row_dimensions[1].height=28
+    ws2.append([_xl_cell(ws2,"Category Summary","xl_stitle")])
+    ws2.append([_xl_cell(ws2,h,"xl_head") for h in ("Category","Count","Members")])
     cats={}
     for rec in regs: cats.setdefault(rec.get("category","Other"),[]).append(f"{rec.get('name','')}[{rec.get('roll_no','')}]")
-    for ri,(cat,names) in enumerate(cats.items(),3):
-        ws2.cell(row=ri,column=1,value=cat).font=XFont(bold=True,color="FFD159")
-        ws2.cell(row=ri,column=2,value=len(names)).font=XFont(color="E0E0E0")
-        ws2.cell(row=ri,column=3,value=", ".join(names)).font=XFont(color="E0E0E0")
-        for col in range(1,4): ws2.cell(row=ri,column=col).fill=hf
-    ws2.column_dimensions["A"].width=20; ws2.column_dimensions["B"].width=10; ws2.column_dimensions["C"].width=80
+    if counts is None: counts={c:len(v) for c,v in cats.items()}
+    for cat,n in counts.items():
+        ws2.append([_xl_cell(ws2,cat,"xl_scat"),_xl_cell(ws2,n,"xl_sval"),
+                    _xl_cell(ws2,", ".join(cats.get(cat,[])),"xl_sval")])
     buf=io.BytesIO(); wb.save(buf); return buf.getvalue()
 
+def bench_excel(sizes=(1000,10000,50000)):
+    """Time build_excel on synthetic registrations."""
+    cats=[c.strip() for c in st.session_state.categories.split(",") if c.strip()] or ["Participant"]
+    out=[]
+    for n in sizes:
+        regs=[{"ref_no":f"B-{i:05d}","name":f"Attendee {i}","roll_no":f"R{i}","department":"Computer Science",
+               "batch":"2024","category":cats[i%len(cats)],"event":"Bench","date":"2026-01-01",
+               "time":"10:00:00"} for i in range(n)]
+        t0=time.perf_counter(); data=build_excel(regs); fast=time.perf_counter()-t0
+        out.append({"Rows":n,"Seconds":round(fast,2),"Rows/s":f"{n/max(fast,1e-9):,.0f}",
+                    "File (MB)":round(len(data)/1e6,2)})
+    return out
+
 def save_all_settings():
     save_config({
         "event_name":st.session_state.event_name,"event_date":st.session_state.event_date,
@@ -752,9 +1734,9 @@ def save_all_settings():
         "organizer":st.session_state.organizer,"categories":st.session_state.categories,
         "student_cats":st.session_state.student_cats_input,"app_url":st.session_state.app_url,
         "inv_theme":st.session_state.inv_theme,
-        "logo1_b64":st.session_state.logo1_b64,
-        "logo2_b64":st.session_state.logo2_b64,
-        "logo3_b64":st.session_state.logo3_b64,
+        "logo1_ref":st.session_state.logo1_ref,
+        "logo2_ref":st.session_state.logo2_ref,
+        "logo3_ref":st.session_state.logo3_ref,
     })
 
 # ══════════════════════════════════════════════════════════════════
@@ -771,9 +1753,7 @@ if page == "form":
     event    = cfg.get("event_name","Certificate Event")
     cats     = [c.strip() for c in cfg.get("categories","Participant").split(",") if c.strip()]
     s_cats   = [c.strip().lower() for c in cfg.get("student_cats","Participant").split(",")]
-    l1b = base64.b64decode(cfg["logo1_b64"]) if cfg.get("logo1_b64") else None
-    l2b = base64.b64decode(cfg["logo2_b64"]) if cfg.get("logo2_b64") else None
-    l3b = base64.b64decode(cfg["logo3_b64"]) if cfg.get("logo3_b64") else None
+    l1b, l2b, l3b = (cfg[f"logo{i}_ref"] or None for i in (1,2,3))   # asset refs
 
     # Header
     st.markdown(f"""
@@ -790,9 +1770,12 @@ if page == "form":
     st.markdown("---")
 
     # ── CONFIRMATION + INVITATION CARD ───────────────────────────
-    if st.session_state.get("form_submitted") and st.session_state.get("invitation_png"):
+    if st.session_state.get("form_submitted") and (st.session_state.get("invitation_png")
+                                                  or st.session_state.get("card_job")):
         rec     = st.session_state.last_submission
-        inv_png = st.session_state.invitation_png
+        inv_png = st.session_state.invitation_png or \
+                  card_result(st.session_state.card_job,(rec,cfg,l1b,l2b,l3b))
+        if inv_png: st.session_state.invitation_png = inv_png
 
         st.markdown("""
         <div style="text-align:center;padding:10px 0;">
@@ -806,7 +1789,8 @@ if page == "form":
         # ── Card display centered ─────────────────────────────────
         _,mid,_ = st.columns([1,3,1])
         with mid:
-            st.image(inv_png, use_container_width=True)
+            if inv_png: st.image(inv_png, use_container_width=True)
+            else: st.info("🎨 Your invitation card is being drawn — it will appear here in a moment…")
 
         st.markdown("---")
 
@@ -816,10 +1800,12 @@ if page == "form":
 
         c1, c2 = st.columns(2)
         with c1:
-            st.download_button(
-                "⬇️  Download Invitation Card",
-                data=inv_png, file_name=fn,
-                mime="image/png", use_container_width=True)
+            if inv_png:
+                st.download_button(
+                    "⬇️  Download Invitation Card",
+                    data=inv_png, file_name=fn,
+                    mime="image/png", use_container_width=True)
+            else: st.button("⏳  Preparing Card…", disabled=True, use_container_width=True)
         with c2:
             # WhatsApp — text + instruction to share the downloaded image
             wa_msg = (
@@ -899,6 +1885,11 @@ if page == "form":
             st.session_state.form_submitted  = False
             st.session_state.last_submission = {}
             st.session_state.invitation_png  = None
+            st.session_state.card_job        = None
+            st.rerun()
+
+        if not inv_png:   # page is already shown — wait for the renderer, then redraw
+            card_result(st.session_state.card_job,(rec,cfg,l1b,l2b,l3b),timeout=10)
             st.rerun()
 
     # ── FORM ─────────────────────────────────────────────────────
@@ -923,6 +1914,7 @@ if page == "form":
 
         st.markdown("---")
         if st.button("✅  Submit Registration", use_container_width=True):
+            t_sub=time.perf_counter()
             n=name.strip(); r=rollno.strip(); d=dept.strip()
             b=batch.strip() if batch else ""
             missing=[]
@@ -938,10 +1930,12 @@ if page == "form":
                           "batch":b,"category":category,"event":event,
                           "date":now.strftime("%Y-%m-%d"),"time":now.strftime("%H:%M:%S")}
                 save_registration(rec)
-                inv_png = generate_invitation_card(rec, cfg, l1b, l2b, l3b)
+                submit_card(ref_no, rec, cfg, l1b, l2b, l3b)
                 st.session_state.form_submitted  = True
                 st.session_state.last_submission = rec
-                st.session_state.invitation_png  = inv_png
+                st.session_state.invitation_png  = None
+                st.session_state.card_job        = ref_no
+                record_submit_latency((time.perf_counter()-t_sub)*1000)
                 st.rerun()
 
         st.markdown('</div>', unsafe_allow_html=True)
@@ -1006,16 +2000,17 @@ with st.sidebar:
         index=list(THEMES.keys()).index(
             st.session_state.inv_theme if st.session_state.inv_theme in THEMES else "royal_gold"))
     st.markdown("**Logos (up to 3):**")
-    for li,lkey in enumerate(["logo1_b64","logo2_b64","logo3_b64"],1):
+    for li in (1,2,3):
+        rkey=f"logo{li}_ref"
         lupl=st.file_uploader(f"Logo {li}",type=["png","jpg","jpeg"],key=f"lu{li}")
         if lupl:
-            st.session_state[lkey]=base64.b64encode(lupl.read()).decode()
+            st.session_state[rkey]=save_asset(lupl.getvalue())
             st.success(f"✅ Logo {li} saved!")
-        elif st.session_state.get(lkey):
-            try: st.image(base64.b64decode(st.session_state[lkey]),width=65)
+        elif st.session_state.get(rkey):
+            try: st.image(asset_bytes(st.session_state[rkey]),width=65)
             except: pass
             if st.button(f"🗑️ Remove",key=f"rm{li}"):
-                st.session_state[lkey]=""; st.rerun()
+                st.session_state[rkey]=""; st.rerun()
     st.markdown("---")
     st.markdown("## 🔤 Font")
     sq=st.text_input("🔍 Search font...",placeholder="bold, times, gothic")
@@ -1053,13 +2048,14 @@ with st.sidebar:
 # ══════════════════════════════════════════════════════════════════
 #  ADMIN TABS
 # ══════════════════════════════════════════════════════════════════
-tab1,tab2,tab3,tab4,tab5,tab6,tab7,tab8,tab9 = st.tabs([
+tab1,tab2,tab3,tab4,tab5,tab6,tab7,tab8,tab9,tab10 = st.tabs([
     "🔳 QR Generate",
     "📊 Registrations",
     "🃏 Invitation Card",
     "🖼️ Certificate",
     "🚀 Bulk Generate",
     "💾 Backup & Security",
+    "⚡ Performance",
     "☁️ Deploy Guide",
     "👨‍💻 Developer",
     "📖 README",
@@ -1126,35 +2122,47 @@ with tab1:
 #  TAB 2 — Registrations
 # ─────────────────────────────────────────────
 with tab2:
-    regs=load_registrations()
     st.markdown("### 📊 Registration Data")
     if st.button("🔄 Refresh"): st.rerun()
     cat_list=[c.strip() for c in st.session_state.categories.split(",") if c.strip()]
+    cat_n=reg_counts("category"); total=sum(cat_n.values())
     mcols=st.columns(min(len(cat_list)+1,6))
-    mcols[0].metric("Total",len(regs))
+    mcols[0].metric("Total",total)
     for i,cat in enumerate(cat_list[:5]):
-        mcols[i+1].metric(cat,sum(1 for r in regs if r.get("category","")==cat))
+        mcols[i+1].metric(cat,cat_n.get(cat,0))
+    if total:
+        with st.expander("📈 Breakdown by department / batch / day"):
+            bcols=st.columns(3)
+            for bc,(dim,lbl) in zip(bcols,[("department","Department"),("batch","Batch"),("date","Date")]):
+                bc.dataframe(pd.DataFrame(list(reg_counts(dim).items()),columns=[lbl,"Count"]),
+                             use_container_width=True,hide_index=True)
     st.markdown("---")
-    if regs:
-        df=pd.DataFrame(regs)
+    if total:
         rename={"ref_no":"Reg No","name":"Full Name","roll_no":"Roll No",
                 "department":"Department","batch":"Batch","category":"Category",
                 "event":"Event","date":"Date","time":"Time"}
-        df=df.rename(columns={k:v for k,v in rename.items() if k in df.columns})
-        fc=st.selectbox("Filter:",["All"]+cat_list,key="flt")
-        st.dataframe(df if fc=="All" else df[df["Category"]==fc],
-                     use_container_width=True,height=380)
+        f1,f2=st.columns([3,1])
+        with f1: fc=st.selectbox("Filter:",["All"]+cat_list,key="flt")
+        shown=total if fc=="All" else cat_n.get(fc,0)
+        pages=max(1,-(-shown//PAGE_SIZE))
+        with f2: pg=st.number_input(f"Page (of {pages})",1,pages,1,key="reg_pg")
+        rows=load_registrations_page(pg-1,PAGE_SIZE,None if fc=="All" else fc)
+        df=pd.DataFrame(rows,columns=CSV_HEADERS).rename(columns=rename)
+        st.dataframe(df,use_container_width=True,height=380)
+        st.caption(f"Showing {len(rows)} of {shown} registrations")
         st.markdown("---")
+        gen=registrations_gen()
         e1,e2,e3=st.columns(3)
         with e1:
-            st.download_button("📊 Excel",build_excel(regs),
-                file_name=f"{st.session_state.event_name.replace(' ','_')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True)
+            lazy_download("⚙️ Prepare Excel","📊 Excel","xlsx",
+                data_version(gen,*(st.session_state[k] for k in ("event_name","event_date","event_venue","organizer"))),
+                lambda: build_excel(load_registrations(),reg_counts()),
+                f"{st.session_state.event_name.replace(' ','_')}.xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
         with e2:
-            st.download_button("📄 TXT",
-                "\n".join(f"{r.get('ref_no','')}|{r['name']}|{r.get('roll_no','')}|{r.get('department','')}|{r.get('category','')}" for r in regs).encode(),
-                file_name="registrations.txt",mime="text/plain",use_container_width=True)
+            lazy_download("⚙️ Prepare TXT","📄 TXT","txt",data_version(gen),
+                lambda: "\n".join(f"{r.get('ref_no','')}|{r['name']}|{r.get('roll_no','')}|{r.get('department','')}|{r.get('category','')}" for r in load_registrations()).encode(),
+                "registrations.txt","text/plain")
         with e3:
             if st.button("🗑️ Clear All",use_container_width=True):
                 clear_registrations(); st.success("Cleared!"); st.rerun()
@@ -1167,9 +2175,7 @@ with tab2:
 with tab3:
     st.markdown("### 🃏 Invitation Card — Preview & Batch")
     cfg_n=load_config(); cfg_n["inv_theme"]=st.session_state.inv_theme
-    l1b=base64.b64decode(st.session_state.logo1_b64) if st.session_state.logo1_b64 else None
-    l2b=base64.b64decode(st.session_state.logo2_b64) if st.session_state.logo2_b64 else None
-    l3b=base64.b64decode(st.session_state.logo3_b64) if st.session_state.logo3_b64 else None
+    l1b,l2b,l3b=(st.session_state[f"logo{i}_ref"] or None for i in (1,2,3))   # asset refs
 
     st.info(f"Theme: **{THEME_LABELS.get(st.session_state.inv_theme,'—')}** | "
             f"Logos: **{sum(1 for x in [l1b,l2b,l3b] if x)}** uploaded | "
@@ -1186,7 +2192,7 @@ with tab3:
     srec={"ref_no":"P-0001","name":pname,"roll_no":proll,"department":pdept,
           "batch":"2022-2026","category":pcat,"event":st.session_state.event_name,
           "date":datetime.now().strftime("%Y-%m-%d")}
-    iprev=generate_invitation_card(srec,cfg_n,l1b,l2b,l3b)
+    iprev=cached_invitation_card(srec,cfg_n,l1b,l2b,l3b)
     _,mid,_=st.columns([1,3,1])
     with mid: st.image(iprev,use_container_width=True,caption="Preview")
     pd1,pd2=st.columns(2)
@@ -1198,19 +2204,39 @@ with tab3:
         if st.button("💾 Save Theme",use_container_width=True):
             save_all_settings(); st.success("✅ Saved!")
     st.markdown("---")
-    regs_inv=load_registrations()
-    if regs_inv:
-        if st.button(f"🚀 Generate All {len(regs_inv)} Invitation Cards",use_container_width=True):
-            p=st.progress(0); s=st.empty(); bz=io.BytesIO()
-            with zipfile.ZipFile(bz,"w",zipfile.ZIP_DEFLATED) as zf:
-                for i,rec in enumerate(regs_inv):
-                    s.markdown(f"⏳ **{rec.get('name','')}** ({i+1}/{len(regs_inv)})")
-                    card=generate_invitation_card(rec,cfg_n,l1b,l2b,l3b)
-                    zf.writestr(f"Invitations/{rec.get('category','Other')}/{rec.get('ref_no','')}-{rec.get('name','')}.png",card)
-                    p.progress((i+1)/len(regs_inv))
-            s.success("✅ Done!")
-            st.download_button("⬇️ All Cards ZIP",bz.getvalue(),
-                file_name="All_Invitations.zip",mime="application/zip",use_container_width=True)
+    n_inv=count_registrations()
+    if n_inv:
+        st.session_state.batch_workers=st.number_input("⚙️ Worker processes",1,64,
+            st.session_state.batch_workers,key="bw_inv")
+        inv_delta=st.checkbox("ZIP only cards that are new or changed since the last export",key="inv_delta")
+        if st.button(f"🚀 Generate All {n_inv} Invitation Cards",use_container_width=True):
+            regs_inv=load_registrations(); logos=[l1b,l2b,l3b]
+            keys=[reg_key(r) for r in regs_inv]
+            outs=[[(card_digest(r,cfg_n,logos),".png")] for r in regs_inv]
+            include,todo=plan_export("invitations",keys,outs,inv_delta)
+            if not include: st.info("✅ No new or changed cards since the last export.")
+            else:
+                p=st.progress(0); s=st.empty(); t0=time.perf_counter(); zs=zip_stats(); done=0
+                arc=lambda r: f"Invitations/{r.get('category','Other')}/{r.get('ref_no','')}-{r.get('name','')}.png"
+                with open_spool("inv_zip","invitations") as zf:
+                    pending=set(todo)
+                    for i in include:
+                        if i in pending: continue
+                        png=render_cache_get(outs[i][0][0])
+                        if png is None: todo.append(i); continue   # evicted since planning
+                        zip_put(zf,arc(regs_inv[i]),png,stats=zs); done+=1; p.progress(done/len(include))
+                    cards=batch_map(_card_task,{"cfg":cfg_n,"logos":logos},[regs_inv[i] for i in todo],
+                                    st.session_state.batch_workers,warm="_card_warm")
+                    for card,i in zip(cards,todo):   # results first, so the pool closes
+                        rec=regs_inv[i]; render_cache_put(outs[i][0][0],card)
+                        s.markdown(f"⏳ **{rec.get('name','')}** ({done+1}/{len(include)})")
+                        zip_put(zf,arc(rec),card,stats=zs); done+=1; p.progress(done/len(include))
+                save_manifest("invitations",keys,outs)
+                dt=time.perf_counter()-t0
+                s.success(f"✅ Done! {len(include)} cards in {dt:.1f}s — {len(include)/max(dt,1e-9):.1f} cards/sec — "
+                          f"{len(todo)} rendered, {len(include)-len(todo)} reused")
+                st.caption(zip_stats_text(zs))
+        spool_download("⬇️ All Cards ZIP","inv_zip","All_Invitations.zip")
     else: st.info("No registrations yet.")
 
 # ─────────────────────────────────────────────
@@ -1234,57 +2260,119 @@ with tab4:
         st.markdown("### 👁️ Live Preview")
         if st.session_state.template_bytes:
             pn=st.text_input("Preview name:","Muhammad Ali Khan",key="cpn")
-            pp=generate_cert(pn,st.session_state.template_bytes,cur_cfg())
+            prend=compile_cert(st.session_state.template_bytes,cur_cfg())
+            pp,_,_=render_cert_files(prend,pn,do_pdf=False)
             st.image(pp,use_container_width=True)
             a,b_=st.columns(2)
             with a: st.download_button("⬇️ PNG",pp,file_name=f"{pn}.png",mime="image/png",use_container_width=True)
-            with b_: st.download_button("⬇️ PDF",cert_to_pdf(pp,pn),file_name=f"{pn}.pdf",mime="application/pdf",use_container_width=True)
+            with b_: lazy_download("⚙️ Prepare PDF","⬇️ PDF","cert_pdf",
+                data_version(hashlib.sha1(st.session_state.template_bytes).hexdigest(),cur_cfg(),
+                             pn,st.session_state.event_name),
+                lambda: cert_to_pdf(prend(pn),pn),f"{pn}.pdf","application/pdf")
         else: st.warning("Upload template first")
         st.markdown('</div>',unsafe_allow_html=True)
-    regs_p=load_registrations()
-    if st.session_state.template_bytes and regs_p:
+    regs_p=load_registrations_page(0,24) if st.session_state.template_bytes else []
+    if regs_p:
         st.markdown("---"); st.markdown("### 👁️ Preview All")
         names_all=[r["name"] for r in regs_p]
         sn=st.slider("How many?",1,min(len(names_all),24),min(6,len(names_all)))
+        tb,cc=st.session_state.template_bytes,cur_cfg()
+        thumbs=cert_thumbnails(tb,cc,names_all[:sn]); tdig=hashlib.sha1(tb).hexdigest()
         for i in range(0,sn,3):
             rn=names_all[i:i+3]; cs=st.columns(3)
             for ci,nm in enumerate(rn):
                 with cs[ci]:
-                    pv=generate_cert(nm,st.session_state.template_bytes,cur_cfg())
-                    st.image(pv,caption=nm,use_container_width=True)
-                    st.download_button(f"⬇️ {nm[:14]}",pv,file_name=f"{nm}.png",mime="image/png",key=f"pv_{i}_{ci}")
+                    st.image(thumbs[i+ci],caption=nm,use_container_width=True)
+                    lazy_download(f"⚙️ {nm[:14]}",f"⬇️ {nm[:14]}",f"pv_{i}_{ci}",
+                        data_version(tdig,cc,nm),lambda nm=nm: generate_cert(nm,tb,cc),
+                        f"{nm}.png","image/png")
 
 # ─────────────────────────────────────────────
 #  TAB 5 — Bulk Generate
 # ─────────────────────────────────────────────
 with tab5:
     st.markdown("### 🚀 Bulk Certificate Generation")
-    regs=load_registrations()
+    n_regs=count_registrations()
     if not st.session_state.template_bytes:
         st.markdown('<div class="card-warn">⚠️ Upload template in Tab 4 first!</div>',unsafe_allow_html=True)
-    elif not regs:
+    elif not n_regs:
         st.markdown('<div class="card-warn">⚠️ No registrations yet.</div>',unsafe_allow_html=True)
     else:
         c1,c2,c3,c4=st.columns(4)
-        c1.metric("Total",len(regs)); c2.metric("Font",st.session_state.selected_font[:14])
+        c1.metric("Total",n_regs); c2.metric("Font",st.session_state.selected_font[:14])
         c3.metric("Size",st.session_state.font_size); c4.metric("Pos",f"{st.session_state.text_x}%,{st.session_state.text_y}%")
-        f1,f2=st.columns(2)
-        with f1: do_png=st.checkbox("PNG",value=True)
-        with f2: do_pdf=st.checkbox("PDF",value=True)
-        if st.button(f"🚀 Generate All {len(regs)}",use_container_width=True):
-            cn=cur_cfg(); p=st.progress(0); s=st.empty(); bz=io.BytesIO()
-            with zipfile.ZipFile(bz,"w",zipfile.ZIP_DEFLATED) as zf:
-                for i,rec in enumerate(regs):
-                    nm=rec["name"]; cat=rec.get("category","Other")
-                    s.markdown(f"⏳ **{nm}** ({i+1}/{len(regs)})")
-                    png=generate_cert(nm,st.session_state.template_bytes,cn)
-                    if do_png: zf.writestr(f"PNG/{cat}/{nm}.png",png)
-                    if do_pdf: zf.writestr(f"PDF/{cat}/{nm}.pdf",cert_to_pdf(png,nm))
-                    p.progress((i+1)/len(regs))
-            s.success(f"✅ {len(regs)} done!"); st.balloons()
-            st.download_button("⬇️ Download ZIP",bz.getvalue(),
-                file_name=f"{st.session_state.event_name.replace(' ','_')}_Certificates.zip",
-                mime="application/zip",use_container_width=True)
+        bmode=st.radio("Output:",["📦 ZIP — PNG/PDF per attendee","📘 Single booklet PDF"],
+                       horizontal=True,key="bulk_mode")
+        booklet=bmode.startswith("📘")
+        if not booklet:
+            f1,f2,f3,f4=st.columns(4)
+            with f1: do_png=st.checkbox("PNG",value=True)
+            with f2: do_pdf=st.checkbox("PDF",value=True)
+            with f4: st.session_state.batch_workers=st.number_input("⚙️ Worker processes",1,64,
+                         st.session_state.batch_workers,key="bw_cert")
+            pdf_vec=st.checkbox("PDF: name as vector text (selectable & searchable, skips the 300-DPI raster)",
+                                value=False,disabled=not do_pdf,key="pdf_vec")
+            # every single-page PDF re-compresses its own copy of the template; lossless
+            # that is nearly as slow as the raster path, a JPEG is embedded as-is
+            with f3: pdf_jpeg=st.checkbox("PDF as JPEG",value=pdf_vec,disabled=not do_pdf)
+            if do_pdf and pdf_vec and not pdf_jpeg:
+                st.caption("ℹ️ Lossless vector PDFs re-compress the full template for every file — "
+                           "about as slow and large as the raster PDF. JPEG keeps them small and fast.")
+            jpeg_q=st.slider("JPEG quality",50,100,90,key="pdf_jq") if do_pdf and pdf_jpeg else None
+            cert_delta=st.checkbox("ZIP only certificates that are new or changed since the last export",
+                                   key="cert_delta")
+        else:
+            st.caption("One PDF, one page per attendee — the template is embedded once "
+                       "and names are selectable text.")
+        if booklet and st.button(f"📘 Build Booklet ({n_regs} pages)",use_container_width=True):
+            regs=load_registrations(); p=st.progress(0); t0=time.perf_counter()
+            cert_booklet_pdf(st.session_state.template_bytes,cur_cfg(),[r["name"] for r in regs],
+                new_spool("cert_booklet","booklet",".pdf"),st.session_state.event_name,
+                progress=lambda i: p.progress((i+1)/len(regs)))
+            st.success(f"✅ {len(regs)} pages in {time.perf_counter()-t0:.1f}s")
+        if booklet:
+            spool_download("⬇️ Download Booklet PDF","cert_booklet",
+                f"{st.session_state.event_name.replace(' ','_')}_Certificates.pdf","application/pdf")
+        elif st.button(f"🚀 Generate All {n_regs}",use_container_width=True):
+            regs=load_registrations(); cc=cur_cfg(); ev=st.session_state.event_name
+            tdig=hashlib.sha1(st.session_state.template_bytes).hexdigest()
+            keys=[reg_key(r) for r in regs]
+            outs=[cert_outputs(tdig,cc,r["name"],do_png,do_pdf,ev,jpeg_q,pdf_vec) for r in regs]
+            include,todo=plan_export("certificates",keys,outs,cert_delta)
+            if not include: st.info("✅ No new or changed certificates since the last export.")
+            else:
+                p=st.progress(0); s=st.empty(); done=0
+                payload={"template":st.session_state.template_bytes,"cfg":cc,
+                         "png":do_png,"pdf":do_pdf,"jpeg":jpeg_q,"vector":pdf_vec,"event":ev}
+                zs=zip_stats(); stage=[0.0]*len(CERT_STAGES)
+                def put(zf,rec,ext,data):
+                    zip_put(zf,f"{ext[1:].upper()}/{rec.get('category','Other')}/{rec['name']}{ext}",data,stats=zs)
+                with open_spool("cert_zip","certificates") as zf:
+                    pending=set(todo)
+                    for i in include:
+                        if i in pending: continue
+                        files=[(ext,render_cache_get(dg,ext)) for dg,ext in outs[i]]
+                        if any(d is None for _,d in files): todo.append(i); continue   # evicted since planning
+                        for ext,data in files: put(zf,regs[i],ext,data)
+                        done+=1; p.progress(done/len(include))
+                    results=batch_map(_cert_task,payload,[regs[i]["name"] for i in todo],
+                                      st.session_state.batch_workers,warm="_cert_warm")
+                    for (png,pdf,secs),i in zip(results,todo):   # results first, so the pool closes
+                        rec=regs[i]; stage=[a+b for a,b in zip(stage,secs)]
+                        s.markdown(f"⏳ **{rec['name']}** ({done+1}/{len(include)})")
+                        for dg,ext in outs[i]:
+                            data=png if ext==".png" else pdf
+                            render_cache_put(dg,data,ext); put(zf,rec,ext,data)
+                        done+=1; p.progress(done/len(include))
+                save_manifest("certificates",keys,outs)
+                s.success(f"✅ {len(include)} done! — {len(todo)} rendered, {len(include)-len(todo)} reused")
+                st.balloons()
+                if todo: st.caption("⏱️ Per certificate (worker time): "+"  ·  ".join(
+                    f"{k} {v*1000/len(todo):.0f} ms" for k,v in zip(CERT_STAGES,stage)))
+                st.caption(zip_stats_text(zs))
+        if not booklet:
+            spool_download("⬇️ Download ZIP","cert_zip",
+                f"{st.session_state.event_name.replace(' ','_')}_Certificates.zip")
 
 # ─────────────────────────────────────────────
 #  TAB 6 — Backup & Security
@@ -1299,14 +2387,16 @@ with tab6:
     if "changed" in auth_info: st.success(f"✅ Password changed: {auth_info['changed'][:10]}")
     else: st.markdown('<div class="card-warn">⚠️ Still using default password — change it!</div>',unsafe_allow_html=True)
     st.markdown("---")
-    regs_b=load_registrations()
     bc1,bc2=st.columns(2)
     with bc1:
-        st.metric("Registrations",len(regs_b))
-        st.download_button("⬇️ Download Backup ZIP",create_backup(),
-            file_name=f"Backup_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
-            mime="application/zip",use_container_width=True)
-        st.caption("Includes: registrations.csv + config.json")
+        st.metric("Registrations",count_registrations())
+        zlvl=st.select_slider("🗜️ Compression level (CSV/JSON)",list(range(1,10)),ZIP_LEVEL,key="zlvl")
+        cfg_st=os.stat(CONFIG_FILE) if os.path.exists(CONFIG_FILE) else None
+        lazy_download("⚙️ Prepare Backup ZIP","⬇️ Download Backup ZIP","backup",
+            data_version(registrations_gen(),zlvl,cfg_st and (cfg_st.st_mtime_ns,cfg_st.st_size)),
+            lambda: create_backup(zlvl),f"Backup_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
+            "application/zip")
+        st.caption("Includes: registrations.csv (exported) + config.json + logo assets")
     with bc2:
         bfiles=sorted(os.listdir(BACKUP_DIR)) if os.path.exists(BACKUP_DIR) else []
         st.markdown(f"**Auto-backups on server:** {len(bfiles)}")
@@ -1316,11 +2406,11 @@ with tab6:
     upl_r=st.file_uploader("Upload CSV to restore:",type=["csv"])
     if upl_r:
         try:
-            rdf=pd.read_csv(upl_r)
+            rdf=pd.read_csv(upl_r,dtype=str,keep_default_na=False)
             st.success(f"✅ {len(rdf)} records found")
             st.dataframe(rdf.head(5),use_container_width=True)
             if st.button("⚠️ Confirm Restore (overwrites current data)"):
-                rdf.to_csv(DATA_FILE,index=False); st.success("✅ Restored!"); st.rerun()
+                replace_registrations(rdf.to_dict("records")); st.success("✅ Restored!"); st.rerun()
         except Exception as e: st.error(f"❌ {e}")
     st.markdown("---")
     st.markdown("#### ⚠️ Danger Zone")
@@ -1333,9 +2423,91 @@ with tab6:
             st.rerun()
 
 # ─────────────────────────────────────────────
-#  TAB 7 — Deploy Guide
+#  TAB 7 — Performance
 # ─────────────────────────────────────────────
 with tab7:
+    st.markdown("### ⚡ Performance & Caches")
+    if st.button("🔄 Refresh Stats"): st.rerun()
+    st.markdown("#### 🔤 Font Cache")
+    fcs=lru_stats(_font_cache())
+    pf1,pf2,pf3=st.columns(3)
+    pf1.metric("Hit Rate",f"{fcs['hit_rate']:.1%}")
+    pf2.metric("Hits / Misses",f"{fcs['hits']:,} / {fcs['misses']:,}")
+    pf3.metric("Fonts Cached",f"{fcs['size']}/{fcs['max']}")
+    st.markdown("#### 🃏 Card Background Layers")
+    bgs=lru_stats(_card_bg_cache())
+    pb1,pb2,pb3=st.columns(3)
+    pb1.metric("Hit Rate",f"{bgs['hit_rate']:.1%}")
+    pb2.metric("Hits / Misses",f"{bgs['hits']:,} / {bgs['misses']:,}")
+    pb3.metric("Layers Cached",f"{bgs['size']}/{bgs['max']}")
+    st.markdown("#### ⚙️ Config Cache")
+    ccs=config_cache_stats()
+    pg1,pg2,pg3=st.columns(3)
+    pg1.metric("Hit Rate",f"{ccs['hit_rate']:.1%}")
+    pg2.metric("Hits / Misses",f"{ccs['hits']:,} / {ccs['misses']:,}")
+    pg3.metric("config.json",f"{ccs['kb']:.1f} KB")
+    st.markdown("#### 🏷️ Decoded Logos")
+    lgs=lru_stats(_logo_cache())
+    pl1,pl2,pl3=st.columns(3)
+    pl1.metric("Hit Rate",f"{lgs['hit_rate']:.1%}")
+    pl2.metric("Hits / Misses",f"{lgs['hits']:,} / {lgs['misses']:,}")
+    pl3.metric("Logos Cached",f"{lgs['size']}/{lgs['max']}")
+    st.markdown("#### 🖼️ Card Preview Cache")
+    cps=card_png_stats()
+    pc1,pc2,pc3=st.columns(3)
+    pc1.metric("Hit Rate",f"{cps['hit_rate']:.1%}")
+    pc2.metric("Hits / Misses",f"{cps['hits']:,} / {cps['misses']:,}")
+    pc3.metric("Cards Cached",f"{cps['size']}/{cps['max']}",f"{cps['mb']:.1f} MB",delta_color="off")
+    st.markdown("#### 💽 Render Store (disk)")
+    cds=render_cache_stats()
+    pk1,pk2,pk3,pk4=st.columns(4)
+    pk1.metric("Hit Rate",f"{cds['hit_rate']:.1%}")
+    pk2.metric("Hits / Misses",f"{cds['hits']:,} / {cds['misses']:,}")
+    pk3.metric("Files Stored",f"{cds['files']:,}",f"{cds['mb']:.0f} / {RENDER_CACHE_MB} MB",delta_color="off")
+    pk4.metric("Evicted",f"{cds['evicted']:,}")
+    st.markdown("#### 📝 Form Submit Latency")
+    sls=submit_latency_stats()
+    ps1,ps2,ps3,ps4=st.columns(4)
+    ps1.metric("Submit p50",f"{sls['p50']:.0f} ms")
+    ps2.metric("Submit p99",f"{sls['p99']:.0f} ms",f"{sls['n']:,} submits",delta_color="off")
+    ps3.metric("Card Render p50 / p99",f"{sls['render_p50']:.0f} / {sls['render_p99']:.0f} ms")
+    ps4.metric("Cards Rendering",sls["pending"])
+    st.markdown("#### 🏆 Certificate Thumbnails")
+    cts=lru_stats(_cert_thumb_cache())
+    pt1,pt2,pt3=st.columns(3)
+    pt1.metric("Hit Rate",f"{cts['hit_rate']:.1%}")
+    pt2.metric("Hits / Misses",f"{cts['hits']:,} / {cts['misses']:,}")
+    pt3.metric("Thumbnails Cached",f"{cts['size']}/{cts['max']}")
+    st.markdown("#### 🖼️ Decoded Certificate Templates")
+    tts=lru_stats(_lru("cert_tpl",CERT_TPL_MAX))
+    pu1,pu2,pu3=st.columns(3)
+    pu1.metric("Hit Rate",f"{tts['hit_rate']:.1%}")
+    pu2.metric("Hits / Misses",f"{tts['hits']:,} / {tts['misses']:,}")
+    pu3.metric("Templates Cached",f"{tts['size']}/{tts['max']}")
+    st.markdown("#### 📋 Registrations Cache")
+    rcs=reg_cache_stats()
+    pr1,pr2,pr3,pr4,pr5=st.columns(5)
+    pr1.metric("Hit Rate",f"{rcs['hit_rate']:.1%}")
+    pr2.metric("Hits / Full Loads",f"{rcs['hits']:,} / {rcs['misses']:,}")
+    pr3.metric("Tail Reads",f"{rcs['tails']:,}",f"{rcs['tail_rows']:,} rows",delta_color="off")
+    pr4.metric("Appended on Save",f"{rcs['appends']:,}")
+    pr5.metric("Rows Cached",f"{rcs['rows']:,}")
+    st.markdown("#### 🌈 Gradient Engine Benchmark")
+    if st.button("▶️ Run Gradient Benchmark"):
+        with st.spinner("Benchmarking..."): gb=bench_gradient()
+        pg1,pg2,pg3=st.columns(3)
+        pg1.metric("Scanline Loop",f"{gb['loop_ms']:.1f} ms")
+        pg2.metric("Array Engine",f"{gb['array_ms']:.1f} ms",f"{gb['speedup']:.1f}× faster")
+        pg3.metric("Pixel Output","Identical" if gb["identical"] else "DIFFERENT")
+    st.markdown("#### 📊 Excel Export Benchmark")
+    if st.button("▶️ Run Excel Benchmark (1k / 10k / 50k rows)"):
+        with st.spinner("Building workbooks..."): xb=bench_excel()
+        st.dataframe(pd.DataFrame(xb),use_container_width=True,hide_index=True)
+
+# ─────────────────────────────────────────────
+#  TAB 8 — Deploy Guide
+# ─────────────────────────────────────────────
+with tab8:
     st.markdown("""
 <div class="card">
 
@@ -1366,9 +2538,9 @@ git push
 """, unsafe_allow_html=True)
 
 # ─────────────────────────────────────────────
-#  TAB 8 — Developer Credits
+#  TAB 9 — Developer Credits
 # ─────────────────────────────────────────────
-with tab8:
+with tab9:
     st.markdown("""
 <style>
 .dev-card{background:linear-gradient(135deg,rgba(14,20,60,.98),rgba(8,12,38,.99));
@@ -1464,9 +2636,9 @@ with tab8:
         st.markdown('<div class="card" style="text-align:center;"><div style="font-size:2rem;">📍</div><p style="color:#ffd159;font-weight:700;">Location</p><p style="color:#7ecefd;">Nawabshah, Sindh, Pakistan</p></div>', unsafe_allow_html=True)
 
 # ─────────────────────────────────────────────
-#  TAB 9 — README
+#  TAB 10 — README
 # ─────────────────────────────────────────────
-with tab9:
+with tab10:
     st.markdown("""
 <div class="card">
 
@@ -1538,7 +2710,8 @@ A complete **event management platform** that lets you:
 ---
 
 ## 💾 Data & Backup
-- All data saved in `registrations.csv` — survives app restarts
+- All data saved in `registrations.db` (SQLite, WAL mode) — survives app restarts
+- An existing `registrations.csv` is imported once on startup (kept as `registrations.csv.migrated`)
 - Config saved in `config.json`
 - **Auto backup** daily to `backups/` folder
 - Manual backup download anytime (Tab 6)
@@ -1550,10 +2723,12 @@ A complete **event management platform** that lets you:
 ```
 app.py              ← Main application
 requirements.txt    ← Python dependencies
-registrations.csv   ← All registration data (auto-created)
-config.json         ← Event settings (auto-created)
+registrations.db    ← All registration data (auto-created)
+config.json         ← Event settings; logos referenced by hash (auto-created)
 auth.json           ← Hashed password (auto-created)
 backups/            ← Auto-backup folder (auto-created)
+render_cache/       ← Rendered cards & certificates, reused until inputs change (auto-created)
+assets/             ← Uploaded logos, stored once by content hash (auto-created)
 ```
 
 ---
@@ -1566,6 +2741,7 @@ qrcode[pil]>=7.4.2
 reportlab>=4.1.0
 openpyxl>=3.1.2
 pandas>=2.0.0
+numpy>=1.24.0
 ```
 
 ---